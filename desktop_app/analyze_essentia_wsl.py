@@ -5,16 +5,53 @@ This script runs on WSL to analyze audio samples using Essentia.
 It connects to the ChromaDB database and updates BPM/Key metadata.
 
 Usage:
-    python analyze_essentia_wsl.py [--db-path PATH] [--force]
+    python analyze_essentia_wsl.py [--db-path PATH] [--force] [--workers N] [--no-cache] [--resume] [--retry-lowconf]
     
 Options:
     --db-path PATH    Path to ChromaDB database (default: ./sample_db)
-    --force           Force reanalysis of all samples (even those already analyzed)
+    --force           Force reanalysis of all samples (even those already analyzed or cached)
+    --workers N       Number of analysis processes (default: number of CPU cores)
+    --no-cache        Ignore the on-disk analysis cache and re-run Essentia on every file
+    --resume          Skip samples already processed by an interrupted previous run
+    --retry-lowconf   Also reanalyze samples flagged with a low-confidence tempo
 """
 
 import os
 import sys
 import argparse
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Analyze audio samples with Essentia (WSL)')
+    parser.add_argument('--db-path', type=str, default='./sample_db',
+                      help='Path to ChromaDB database (default: ./sample_db)')
+    parser.add_argument('--force', action='store_true',
+                      help='Force reanalysis of all samples')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                      help='Number of analysis processes (default: number of CPU cores)')
+    parser.add_argument('--no-cache', action='store_true',
+                      help='Ignore the on-disk analysis cache')
+    parser.add_argument('--resume', action='store_true',
+                      help='Skip samples already processed by an interrupted previous run')
+    parser.add_argument('--retry-lowconf', action='store_true',
+                      help='Also reanalyze samples whose tempo was flagged as low confidence')
+    return parser
+
+
+# Native thread pools that would otherwise each start one thread per core
+# inside every worker process. OpenMP/OpenBLAS/MKL read these only when they
+# are loaded, and the forked workers inherit the already loaded libraries, so
+# they must be set here, before numpy and essentia are imported. Parallelism
+# comes from the process pool; a single-process run keeps the defaults
+THREAD_LIMIT_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+if __name__ == "__main__" and build_parser().parse_known_args()[0].workers > 1:
+    for _var in THREAD_LIMIT_VARS:
+        os.environ[_var] = "1"
+
+import time
+import signal
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import chromadb
 import numpy as np
 from tqdm import tqdm
@@ -31,17 +68,6 @@ except ImportError as e:
     sys.exit(1)
 
 
-def wsl_path_to_windows(wsl_path):
-    """Convert WSL path to Windows path if needed"""
-    if wsl_path.startswith("/mnt/"):
-        parts = wsl_path.split('/')
-        drive_letter = parts[2]
-        rest_of_path = "/".join(parts[3:])
-        windows_path = f"{drive_letter.upper()}:/{rest_of_path}"
-        return windows_path
-    return wsl_path
-
-
 def windows_path_to_wsl(windows_path):
     """Convert Windows path to WSL path if needed"""
     if len(windows_path) >= 2 and windows_path[1] == ':':
@@ -52,146 +78,357 @@ def windows_path_to_wsl(windows_path):
     return windows_path
 
 
+# RhythmExtractor2013 only supports 44.1 kHz input, but key detection never
+# looks above 3.5 kHz so it runs on a half-rate copy of the audio
+SAMPLE_RATE = 44100
+KEY_SAMPLE_RATE = 22050
+
+# libsamplerate quality (0 = best ... 4 = fastest linear). Tempo and key
+# estimation don't need studio-grade resampling when decoding
+RESAMPLE_QUALITY = 4
+# The 2:1 downsample for key detection needs a real (sinc) low-pass: linear
+# mode would fold hats/cymbals above 11 kHz into the band the HPCP reads.
+# 2 is the fastest sinc mode, cheap next to KeyExtractor
+KEY_RESAMPLE_QUALITY = 2
+
+# Only the start of a sample is analyzed
+MAX_ANALYSIS_SECONDS = 30.0
+
+# analysis_engine values written to the metadata
+ENGINE = "essentia"
+LOW_CONFIDENCE_ENGINE = "essentia_lowconf"
+
+# RhythmExtractor2013 (multifeature) confidence runs from 0 to ~5.3; below
+# this the detected tempo is not trusted
+MIN_BEATS_CONFIDENCE = 1.5
+
+# Spectral flatness of the first few seconds above which a sample is treated
+# as noisy/percussive and key detection is skipped. The screen is a single
+# fixed-size FFT (~3 s at 22.05 kHz, zero-padded for shorter samples) so each
+# worker plans it once instead of for every sample length
+TONAL_SCREEN_SIZE = 65536
+MAX_TONAL_FLATNESS = 0.3
+
+# Essentia algorithms are expensive to construct, so each process builds them
+# once and resets them between files
+_algorithms = None
+
+
+def get_algorithms():
+    """Return the per-process Essentia algorithm instances, building them on first use"""
+    global _algorithms
+    if _algorithms is None:
+        _algorithms = {
+            'rhythm_extractor': es.RhythmExtractor2013(method="multifeature"),
+            'resampler': es.Resample(inputSampleRate=SAMPLE_RATE,
+                                     outputSampleRate=KEY_SAMPLE_RATE,
+                                     quality=KEY_RESAMPLE_QUALITY),
+            'spectrum': es.Spectrum(size=TONAL_SCREEN_SIZE),
+            'flatness': es.Flatness(),
+            # Windowing -> Spectrum -> SpectralPeaks -> HPCP -> Key in one C++
+            # algorithm. Frame sizes are halved along with the sample rate so
+            # the frequency resolution stays the same
+            'key_extractor': es.KeyExtractor(sampleRate=KEY_SAMPLE_RATE,
+                                             frameSize=2048,
+                                             hopSize=1024,
+                                             windowType='blackmanharris62',
+                                             minFrequency=20,
+                                             maxFrequency=3500,
+                                             maximumSpectralPeaks=60,
+                                             spectralPeaksThreshold=0.00001,
+                                             hpcpSize=36,
+                                             weightType='cosine',
+                                             profileType='edma'),
+        }
+    return _algorithms
+
+
+def init_worker():
+    """Process pool initializer: build the Essentia algorithms before the first file arrives"""
+    # Per-file info messages from N workers would just interleave with tqdm
+    essentia.log.infoActive = False
+    # Ctrl-C is handled by the main process, which saves progress and cancels
+    # pending files; workers just finish the file they are on
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    get_algorithms()
+
+
+def fold_bpm(base_bpm):
+    """Double slow / halve fast tempos and keep the candidate closest to 120 BPM"""
+    candidates = (
+        base_bpm,
+        base_bpm * 2 if base_bpm < 80 else base_bpm,
+        base_bpm / 2 if base_bpm > 160 else base_bpm,
+    )
+    final_bpm = min((b for b in candidates if 40 <= b <= 200),
+                    key=lambda b: abs(b - 120), default=None)
+    return round(final_bpm, 1) if final_bpm is not None else None
+
+
+def stat_audio_file(file_path):
+    """Find the sample on this system with a single stat per candidate path.
+    
+    Returns (path, stat_result), or (None, None) if the file can't be found.
+    """
+    # /mnt/ and native paths are already usable inside WSL; only paths stored
+    # by the Windows app (C:\...) need converting, with the original as fallback
+    wsl_path = windows_path_to_wsl(file_path)
+    candidates = (wsl_path, file_path) if wsl_path != file_path else (file_path,)
+    for candidate in candidates:
+        try:
+            return candidate, os.stat(candidate)
+        except OSError:
+            continue
+    return None, None
+
+
 def get_bpm_and_key_essentia(file_path):
-    """Extract BPM and Key using Essentia"""
+    """Extract BPM and Key using Essentia.
+    
+    Returns (bpm, key, engine) where engine is the analysis_engine value to
+    store: ENGINE, or LOW_CONFIDENCE_ENGINE if the beat tracker wasn't sure.
+    """
     try:
-        # Convert Windows path to WSL path if needed for file access
-        file_to_load = wsl_path_to_windows(file_path) if file_path.startswith("/mnt/") else file_path
-        
-        # Try both path formats
-        if not os.path.exists(file_to_load):
-            file_to_load = windows_path_to_wsl(file_path)
-        
-        if not os.path.exists(file_to_load):
+        file_to_load, _ = stat_audio_file(file_path)
+        if file_to_load is None:
             print(f"  Warning: File not found: {file_path}")
-            return None, None
+            return None, None, ENGINE
         
-        # Load audio with Essentia (up to 30 seconds for analysis)
-        loader = es.MonoLoader(filename=file_to_load, sampleRate=44100)
+        # Load audio with Essentia, decoding only the first 30 seconds
+        # (EasyLoader is MonoLoader + trimming; the default replayGain of -6 dB
+        # leaves the level untouched)
+        loader = es.EasyLoader(filename=file_to_load, sampleRate=SAMPLE_RATE,
+                               endTime=MAX_ANALYSIS_SECONDS,
+                               resampleQuality=RESAMPLE_QUALITY)
         audio = loader()
         
-        # Limit to 30 seconds to speed up analysis
-        max_samples = 44100 * 30
-        if len(audio) > max_samples:
-            audio = audio[:max_samples]
-        
         # Skip very short samples
-        if len(audio) < 44100 * 0.5:
-            return None, None
+        if len(audio) < SAMPLE_RATE * 0.5:
+            return None, None, ENGINE
         
         bpm = None
         key = None
+        engine = ENGINE
+        algorithms = get_algorithms()
         
         # === BPM Detection using RhythmExtractor2013 ===
         try:
-            rhythm_extractor = es.RhythmExtractor2013(method="multifeature")
-            bpm_value, beats, beats_confidence, _, beats_intervals = rhythm_extractor(audio)
+            # RhythmExtractor2013 keeps internal state and must be reset between files
+            rhythm_extractor = algorithms['rhythm_extractor']
+            rhythm_extractor.reset()
+            # Only the tempo and its confidence are used; drop the beat position
+            # and interval arrays right away instead of keeping them alive
+            # through key detection
+            rhythm = rhythm_extractor(audio)
+            bpm_value, beats_confidence = rhythm[0], rhythm[2]
+            del rhythm
             
-            if bpm_value > 0:
+            if beats_confidence < MIN_BEATS_CONFIDENCE:
+                # Unreliable tempo (typically off by x2 or /2); leave BPM
+                # unset and flag the sample (retried with --retry-lowconf)
+                engine = LOW_CONFIDENCE_ENGINE
+            elif bpm_value > 0:
                 # Apply similar heuristics as librosa for consistency
-                base_bpm = float(bpm_value)
-                candidates = [base_bpm]
-                
-                if base_bpm < 80:
-                    candidates.append(base_bpm * 2)
-                if base_bpm > 160:
-                    candidates.append(base_bpm / 2)
-                
-                valid_candidates = [b for b in candidates if 40 <= b <= 200]
-                
-                if valid_candidates:
-                    final_bpm = min(valid_candidates, key=lambda x: abs(x - 120))
-                    bpm = round(final_bpm, 1)
+                bpm = fold_bpm(float(bpm_value))
         except Exception as e:
             print(f"  BPM Error: {e}")
         
-        # === Key Detection using HPCP and Key algorithm ===
+        # === Key Detection using KeyExtractor ===
         try:
-            # First, compute HPCP (Harmonic Pitch Class Profile) from audio
-            windowing = es.Windowing(type='blackmanharris62')
-            spectrum = es.Spectrum()
-            spectral_peaks = es.SpectralPeaks(orderBy='magnitude',
-                                               magnitudeThreshold=0.00001,
-                                               minFrequency=20,
-                                               maxFrequency=3500,
-                                               maxPeaks=60)
+            resampler = algorithms['resampler']
+            resampler.reset()
             
-            # Compute HPCP with size that's multiple of 12
-            hpcp_extractor = es.HPCP(size=36,
-                                    referenceFrequency=440,
-                                    bandPreset=False,
-                                    minFrequency=20,
-                                    maxFrequency=3500,
-                                    weightType='cosine',
-                                    nonLinear=False,
-                                    windowSize=1.)
-            
-            # Process audio frames to get HPCP
-            frame_size = 4096
-            hop_size = 2048
-            hpcp_values = []
-            
-            for frame_start in range(0, len(audio) - frame_size, hop_size):
-                frame = audio[frame_start:frame_start + frame_size]
-                windowed_frame = windowing(frame)
-                spec = spectrum(windowed_frame)
-                frequencies, magnitudes = spectral_peaks(spec)
-                
-                if len(frequencies) > 0:
-                    hpcp = hpcp_extractor(frequencies, magnitudes)
-                    hpcp_values.append(hpcp)
+            # Half the sample rate halves the FFT work per frame
+            key_audio = resampler(audio)
             
-            if hpcp_values:
-                # Average HPCP across all frames
-                avg_hpcp = np.mean(hpcp_values, axis=0)
-                
-                # Now use Key algorithm with the averaged HPCP
-                key_extractor = es.Key(profileType='edma', pcpSize=36)
-                key_result = key_extractor(avg_hpcp)
-                
-                # Handle different return formats
-                if isinstance(key_result, tuple):
-                    if len(key_result) >= 3:
-                        detected_key = key_result[0]
-                        detected_scale = key_result[1]
-                        strength = key_result[2]
-                        
-                        # Only accept if confidence is reasonable
-                        if strength > 0.5:
-                            scale_abbr = "maj" if detected_scale == "major" else "min"
-                            key = f"{detected_key} {scale_abbr}"
+            # Drum hits and noise have no stable pitch content; a flat spectrum
+            # means key detection would only produce a low-confidence key
+            if is_tonal(key_audio, algorithms):
+                key = detect_key(key_audio, algorithms)
         except Exception as e:
             # Silently skip key detection errors
             pass
         
-        return bpm, key
+        return bpm, key, engine
         
     except Exception as e:
         print(f"  Analysis error for {file_path}: {e}")
-        return None, None
+        return None, None, ENGINE
 
 
-def main():
-    parser = argparse.ArgumentParser(description='Analyze audio samples with Essentia (WSL)')
-    parser.add_argument('--db-path', type=str, default='./sample_db',
-                      help='Path to ChromaDB database (default: ./sample_db)')
-    parser.add_argument('--force', action='store_true',
-                      help='Force reanalysis of all samples')
+def is_tonal(key_audio, algorithms):
+    """Cheap screen on the spectral flatness of the first seconds of audio"""
+    screen = key_audio[:TONAL_SCREEN_SIZE]
+    if len(screen) < TONAL_SCREEN_SIZE:
+        screen = np.pad(screen, (0, TONAL_SCREEN_SIZE - len(screen)))
+    spectrum = algorithms['spectrum']
+    flatness = algorithms['flatness']
+    spectrum.reset()
+    flatness.reset()
+    return flatness(spectrum(screen)) <= MAX_TONAL_FLATNESS
+
+
+def detect_key(key_audio, algorithms):
+    """Estimate the musical key from the averaged HPCP of the audio"""
+    key_extractor = algorithms['key_extractor']
+    key_extractor.reset()
+    detected_key, detected_scale, strength = key_extractor(key_audio)
     
-    args = parser.parse_args()
+    # Only accept if confidence is reasonable
+    if strength > 0.5:
+        scale_abbr = "maj" if detected_scale == "major" else "min"
+        return f"{detected_key} {scale_abbr}"
+    return None
+
+
+# Part of every cache signature: bump it whenever the analysis itself changes
+# (algorithm settings, thresholds, BPM folding) so old results are not reused
+ANALYSIS_VERSION = 2
+
+
+def cache_path(db_path):
+    """Analysis cache file, kept next to the database so it survives DB resets"""
+    return os.path.normpath(db_path) + ".essentia_cache.sqlite"
+
+
+class AnalysisCache:
+    """On-disk cache of Essentia results keyed by analysis version, file path, size and mtime"""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS analysis ("
+            "signature TEXT PRIMARY KEY, bpm REAL, key TEXT, engine TEXT, ts REAL)"
+        )
+
+    @staticmethod
+    def signature(file_path):
+        """Cheap content signature of a sample, or None if the file can't be found"""
+        file_to_load, stat = stat_audio_file(file_path)
+        if file_to_load is None:
+            return None
+        return f"{ANALYSIS_VERSION}|{file_to_load}|{stat.st_size}|{stat.st_mtime_ns}"
+
+    def get(self, signature):
+        """Return the cached (bpm, key, engine) for a signature, or None on a miss"""
+        return self.conn.execute(
+            "SELECT bpm, key, engine FROM analysis WHERE signature = ?", (signature,)
+        ).fetchone()
+
+    def put(self, signature, bpm, key, engine):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO analysis VALUES (?, ?, ?, ?, ?)",
+            (signature, bpm, key, engine, time.time())
+        )
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+class Checkpoint:
+    """Sidecar file listing the sample ids whose results have been saved, for --resume"""
+
+    def __init__(self, db_path):
+        self.path = os.path.normpath(db_path) + ".essentia_checkpoint"
+        self.file = None
+
+    def load(self):
+        """Return the set of sample ids saved by a previous run"""
+        if not os.path.exists(self.path):
+            return set()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return {line.rstrip('\n') for line in f if line.strip()}
+
+    def open(self, resume=False):
+        self.file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+
+    def add(self, sample_ids):
+        self.file.write("".join(f"{sample_id}\n" for sample_id in sample_ids))
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def finish(self):
+        """Run completed: the checkpoint is no longer needed"""
+        self.close()
+        os.remove(self.path)
+
+
+# Page size for reading metadata out of ChromaDB
+FETCH_PAGE_SIZE = 10000
+
+# Samples without BPM/Key or analyzed with librosa. Samples flagged with
+# LOW_CONFIDENCE_ENGINE also lack a BPM, but the same analysis would just flag
+# them again, so they are only retried with --retry-lowconf (or --force)
+NEEDS_ANALYSIS_WHERE = {
+    "$or": [
+        {"analysis_engine": "librosa"},
+        {"bpm": {"$lte": 0}},
+        {"key": ""},
+    ]
+}
+RETRY_LOWCONF_WHERE = {"$or": NEEDS_ANALYSIS_WHERE["$or"] + [{"analysis_engine": LOW_CONFIDENCE_ENGINE}]}
+
+
+def fetch_sample_metadatas(collection, where=None):
+    """Page through the collection fetching only ids and metadatas (no embeddings/documents)"""
+    sample_ids = []
+    metadatas = []
+    offset = 0
+    while True:
+        page = collection.get(where=where, include=['metadatas'],
+                              limit=FETCH_PAGE_SIZE, offset=offset)
+        page_ids = page.get('ids', [])
+        sample_ids.extend(page_ids)
+        metadatas.extend(page.get('metadatas', []))
+        if len(page_ids) < FETCH_PAGE_SIZE:
+            return sample_ids, metadatas
+        offset += FETCH_PAGE_SIZE
+
+
+# ChromaDB commits once per update call, so flush in large batches, but at
+# least every few seconds so an interrupted run loses little work
+UPDATE_BATCH_SIZE = 500
+FLUSH_INTERVAL_SECONDS = 10
+
+
+def update_metadatas(collection, batch_updates):
+    """Write (id, metadata) pairs to ChromaDB, retrying with halved batches on failure"""
+    ids = [item[0] for item in batch_updates]
+    metas = [item[1] for item in batch_updates]
+    try:
+        collection.update(ids=ids, metadatas=metas)
+    except Exception as e:
+        if len(batch_updates) == 1:
+            print(f"\nError updating {ids[0]}: {e}")
+            return
+        half = len(batch_updates) // 2
+        update_metadatas(collection, batch_updates[:half])
+        update_metadatas(collection, batch_updates[half:])
+
+
+def main():
+    args = build_parser().parse_args()
     
     print("=" * 60)
     print("Essentia Audio Analysis (WSL)")
     print("=" * 60)
     print(f"Database: {args.db_path}")
     print(f"Force reanalysis: {args.force}")
-    print()
+    print(f"Workers: {args.workers}")
     
     # Convert Windows path to WSL path for database
     db_path = args.db_path
     if db_path.startswith("D:") or db_path.startswith("d:"):
         db_path = windows_path_to_wsl(db_path)
         print(f"Converted database path to WSL: {db_path}")
+    print(f"Analysis cache: {'disabled' if args.no_cache else cache_path(db_path)}")
+    print()
     
     # Check if database exists
     if not os.path.exists(db_path):
@@ -208,37 +445,38 @@ def main():
         print(f"ERROR: Could not connect to database: {e}")
         sys.exit(1)
     
-    # Get all samples
+    # Fetch only the samples that need analysis. Without --force, let ChromaDB
+    # select samples without BPM/Key or analyzed with librosa
     print("Fetching samples from database...")
     try:
-        all_samples = collection.get()
-        sample_ids = all_samples.get('ids', [])
-        metadatas = all_samples.get('metadatas', [])
-        print(f"Found {len(sample_ids)} samples in database")
+        print(f"Found {collection.count()} samples in database")
+        if args.force:
+            where = None
+        else:
+            where = RETRY_LOWCONF_WHERE if args.retry_lowconf else NEEDS_ANALYSIS_WHERE
+        sample_ids, metadatas = fetch_sample_metadatas(collection, where=where)
     except Exception as e:
         print(f"ERROR: Could not fetch samples: {e}")
         sys.exit(1)
     
-    # Filter samples based on force flag
-    samples_to_analyze = []
-    for i, metadata in enumerate(metadatas):
-        if args.force:
-            # Analyze all samples
-            samples_to_analyze.append((sample_ids[i], metadata))
-        else:
-            # Only analyze samples without BPM/Key or analyzed with librosa
-            analysis_engine = metadata.get('analysis_engine', '')
-            bpm = metadata.get('bpm', 0)
-            key = metadata.get('key', '')
-            
-            if analysis_engine == 'librosa' or bpm == 0 or not key:
-                samples_to_analyze.append((sample_ids[i], metadata))
+    samples_to_analyze = list(zip(sample_ids, metadatas))
+    if not (args.force or args.retry_lowconf):
+        # Flagged samples still match the missing-BPM clause
+        samples_to_analyze = [s for s in samples_to_analyze
+                              if s[1].get('analysis_engine') != LOW_CONFIDENCE_ENGINE]
+    
+    checkpoint = Checkpoint(db_path)
+    if args.resume:
+        done = checkpoint.load()
+        samples_to_analyze = [s for s in samples_to_analyze if s[0] not in done]
+        print(f"Resuming: skipping {len(done)} samples from the previous run")
     
     total = len(samples_to_analyze)
     print(f"Samples to analyze: {total}")
     
     if total == 0:
-        print("No samples need analysis. Use --force to reanalyze all samples.")
+        print("No samples need analysis. Use --force to reanalyze all samples"
+              " or --retry-lowconf for low-confidence ones.")
         return
     
     print()
@@ -248,42 +486,95 @@ def main():
     # Analyze samples
     updated = 0
     batch_updates = []
+    processed_ids = []
+    last_flush = time.monotonic()
+    cache = None if args.no_cache else AnalysisCache(cache_path(db_path))
+    checkpoint.open(resume=args.resume)
     
-    for file_path, metadata in tqdm(samples_to_analyze, desc="Analyzing", unit="sample"):
+    def flush():
+        """Save pending metadata updates, cache entries and checkpoint ids"""
+        nonlocal last_flush
+        if batch_updates:
+            update_metadatas(collection, batch_updates)
+            batch_updates.clear()
+        if cache:
+            cache.commit()
+        checkpoint.add(processed_ids)
+        processed_ids.clear()
+        last_flush = time.monotonic()
+    
+    # Each file is analyzed independently in a worker process; only the main
+    # process talks to ChromaDB and the analysis cache
+    interrupted = False
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker) as executor:
+        cached_results = []
+        futures = {}
+        for file_path, metadata in samples_to_analyze:
+            signature = cache.signature(file_path) if cache else None
+            # --force re-runs Essentia on every file, but still refreshes the cache
+            cached = cache.get(signature) if signature and not args.force else None
+            if cached is not None:
+                cached_results.append((file_path, metadata, cached))
+            else:
+                future = executor.submit(get_bpm_and_key_essentia, file_path)
+                futures[future] = (file_path, metadata, signature)
+        
+        if cache:
+            print(f"Cached results: {len(cached_results)}")
+        
+        def iter_results():
+            yield from cached_results
+            for future in as_completed(futures):
+                file_path, metadata, signature = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"\nError analyzing {file_path}: {e}")
+                    continue
+                if signature:
+                    cache.put(signature, *result)
+                yield file_path, metadata, result
+        
         try:
-            # Analyze BPM and Key
-            bpm, key = get_bpm_and_key_essentia(file_path)
-            
-            updated_something = False
-            if bpm is not None and bpm > 0:
-                metadata['bpm'] = bpm
-                updated_something = True
-            if key is not None:
-                metadata['key'] = key
-                updated_something = True
-            
-            # Always mark as analyzed with essentia
-            metadata['analysis_engine'] = 'essentia'
-            
-            if updated_something or args.force:
-                batch_updates.append((file_path, metadata))
-                updated += 1
+            for file_path, metadata, (bpm, key, engine) in tqdm(iter_results(), total=total,
+                                                                desc="Analyzing", unit="sample"):
+                updated_something = False
+                if bpm is not None and bpm > 0:
+                    metadata['bpm'] = bpm
+                    updated_something = True
+                if key is not None:
+                    metadata['key'] = key
+                    updated_something = True
                 
-                # Batch update every 50 samples for efficiency
-                if len(batch_updates) >= 50:
-                    ids = [item[0] for item in batch_updates]
-                    metas = [item[1] for item in batch_updates]
-                    collection.update(ids=ids, metadatas=metas)
-                    batch_updates = []
-        
-        except Exception as e:
-            print(f"\nError analyzing {file_path}: {e}")
+                # Always mark as analyzed with essentia (flagged if the BPM was unreliable),
+                # and save that even when no BPM/Key was found
+                engine_changed = metadata.get('analysis_engine') != engine
+                metadata['analysis_engine'] = engine
+                
+                if updated_something or engine_changed or args.force:
+                    batch_updates.append((file_path, metadata))
+                    updated += 1
+                processed_ids.append(file_path)
+                
+                # Batch updates to keep the number of DB commits low
+                if (len(batch_updates) >= UPDATE_BATCH_SIZE
+                        or time.monotonic() - last_flush >= FLUSH_INTERVAL_SECONDS):
+                    flush()
+        except KeyboardInterrupt:
+            interrupted = True
+            print("\nInterrupted - saving progress...")
+            executor.shutdown(wait=False, cancel_futures=True)
     
-    # Update any remaining samples in the batch
-    if batch_updates:
-        ids = [item[0] for item in batch_updates]
-        metas = [item[1] for item in batch_updates]
-        collection.update(ids=ids, metadatas=metas)
+    # Save whatever is left in the batch
+    flush()
+    if cache:
+        cache.close()
+    
+    if interrupted:
+        checkpoint.close()
+        print(f"Saved {updated} updates. Run again with --resume to continue.")
+        sys.exit(130)
+    checkpoint.finish()
     
     print()
     print("=" * 60)
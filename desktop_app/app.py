@@ -1,5 +1,13 @@
 import os
+# torch and MKL-linked numpy/librosa each ship an Intel OpenMP runtime on Windows;
+# without this the second one to load aborts the process (OMP Error #15)
 os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
+# Cap the BLAS/OpenMP thread pools (unless the user already set them) so the
+# model, numpy and the analysis processes don't each spawn one thread per core
+# (indexing further holds BLAS to one thread per decode worker, see indexer)
+THREAD_LIMIT_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+for _var in THREAD_LIMIT_VARS:
+    os.environ.setdefault(_var, str(max(1, (os.cpu_count() or 4) // 2)))
 # Suppress ffmpeg/libav warnings for audio decoding (e.g., vorbis timestamp warnings)
 os.environ["PYTHONWARNINGS"] = "ignore"
 os.environ["AV_LOG_LEVEL"] = "error"  # Only show critical ffmpeg errors
@@ -12,19 +20,19 @@ from PyQt6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QLineEdit,
                              QHBoxLayout, QFileDialog, QMessageBox, QProgressBar, QLabel,
                              QSpinBox, QDoubleSpinBox, QComboBox, QGroupBox, QCheckBox, QSlider,
                              QGridLayout, QFrame)
-from PyQt6.QtCore import Qt, QMimeData, QUrl, QThread, pyqtSignal, QSize, QTimer
+from PyQt6.QtCore import (Qt, QMimeData, QUrl, QObject, QRunnable, QThreadPool, QSignalBlocker,
+                          pyqtSignal, QSize, QTimer)
 from PyQt6.QtGui import QDrag, QShortcut, QKeySequence, QIcon, QPainter, QPen, QColor
 from PyQt6.QtCore import QRect
 import re
 import os
 import time
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from collections import deque
 from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
-from searcher import SampleSearcher
-from indexer import IndexerBackend
 import ctypes
-import wave
 import json
-from mutagen import File as MutagenFile
 
 myappid = 'mycompany.myproduct.subproduct.version'
 try:
@@ -33,162 +41,264 @@ except (ImportError, AttributeError):
     # AttributeError occurs in WSL/Linux where windll doesn't exist
     pass
 
-class IndexingWorker(QThread):
+# Minimum seconds between progress signals from worker threads (10 Hz)
+PROGRESS_EMIT_INTERVAL = 0.1
+
+def throttled_progress(signal):
+    """Wrap a progress signal so it only emits on a changed percentage, at most 10 Hz.
+
+    100% always goes through so the bar never stalls just short of the end.
+    """
+    last_pct = -1
+    last_emit = 0.0
+
+    def emit(pct):
+        nonlocal last_pct, last_emit
+        now = time.monotonic()
+        if pct != last_pct and (pct >= 100 or now - last_emit > PROGRESS_EMIT_INTERVAL):
+            signal.emit(pct)
+            last_pct = pct
+            last_emit = now
+    return emit
+
+class WorkerSignals(QObject):
+    """Signals for the indexing/analysis runnables (QRunnable can't emit itself)."""
     finished = pyqtSignal(int)
-    progress = pyqtSignal(int) 
+    progress = pyqtSignal(int)
     status_update = pyqtSignal(str)
 
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def to_wsl_path(path):
+    """Convert a Windows path (C:\\foo\\bar) to its WSL mount path (/mnt/c/foo/bar)."""
+    path = path.replace("\\", "/")
+    if len(path) >= 2 and path[1] == ':':
+        return f"/mnt/{path[0].lower()}{path[2:]}"
+    return path
+
+# Result rows, previews and drags convert the same few paths over and over
+@lru_cache(maxsize=4096)
+def wsl_to_windows_path(path):
+    """Convert a WSL mount path (/mnt/c/foo/bar) back to a Windows path (C:\\foo\\bar)."""
+    if not path.startswith("/mnt/"):
+        return path
+    drive, _, rest = path[5:].partition('/')
+    return f"{drive.upper()}:\\" + rest.replace('/', '\\')
+
+# Coalesce WSL output into at most one status update per interval (seconds)
+STATUS_EMIT_INTERVAL = 0.1
+OUTPUT_LINE_SPLIT = re.compile(rb"[\r\n]")
+
+class EssentiaWSLSignals(QObject):
+    finished = pyqtSignal(str)
+    status_update = pyqtSignal(str)
+    error = pyqtSignal(str)
+
+class IndexingWorker(QRunnable):
     def __init__(self, folder_path, db_path=None):
         super().__init__()
+        self.signals = WorkerSignals()
         self.folder_path = folder_path
         self.db_path = db_path
     
     def run(self):
-        self.status_update.emit("Loading Indexer models...")
-        indexer = IndexerBackend(db_path=self.db_path) if self.db_path else IndexerBackend()
+        self.signals.status_update.emit("Loading Indexer models...")
+        from indexer import get_indexer
+        indexer = get_indexer(self.db_path) if self.db_path else get_indexer()
         
         # Inform user which engine is being used
         engine_name = indexer.get_audio_engine()
-        self.status_update.emit(f"Using {engine_name} engine for BPM/Key detection")
+        self.signals.status_update.emit(f"Using {engine_name} engine for BPM/Key detection")
 
-        def callback_bridge(percentage):
-            self.progress.emit(percentage)
+        callback_bridge = throttled_progress(self.signals.progress)
 
-        self.status_update.emit(f"Starting indexing on {self.folder_path}")
+        self.signals.status_update.emit(f"Starting indexing on {self.folder_path}")
         try:
             count = indexer.run_indexing(self.folder_path, progress_callback=callback_bridge)
         except Exception as e:
-            self.status_update.emit(f"FATAL INDEXING ERROR: {e}")
+            self.signals.status_update.emit(f"FATAL INDEXING ERROR: {e}")
             count = 0
-        self.finished.emit(count)
+        self.signals.finished.emit(count)
 
-class BPMReanalysisWorker(QThread):
-    finished = pyqtSignal(int)
-    progress = pyqtSignal(int) 
-    status_update = pyqtSignal(str)
+def init_analysis_process():
+    """Pool initializer: one BLAS/OpenMP thread per analysis process.
+
+    The pool already runs one process per core. This lives here rather than in
+    audio_analysis so it runs before the child imports numpy through it.
+    """
+    for var in THREAD_LIMIT_VARS:
+        os.environ[var] = "1"
+
+# Librosa reanalysis processes (Windows' ProcessPoolExecutor allows at most 61)
+REANALYSIS_WORKERS = min(os.cpu_count() or 4, 61)
 
-    def __init__(self, force_reanalysis=False, db_path=None):
+# Samples per collection.update() call during librosa reanalysis
+REANALYSIS_UPDATE_BATCH_SIZE = 500
+
+def is_too_short_wav(file_path):
+    """True for WAVs whose header says they're too short for BPM/Key analysis"""
+    if not file_path.lower().endswith('.wav'):
+        return False
+    from audio_analysis import wav_quick_duration, MIN_ANALYSIS_SECONDS
+    duration = wav_quick_duration(file_path)
+    return duration is not None and duration < MIN_ANALYSIS_SECONDS
+
+class BPMReanalysisWorker(QRunnable):
+    def __init__(self, force_reanalysis=False, db_path=None, collection=None):
         super().__init__()
+        self.signals = WorkerSignals()
         self.force_reanalysis = force_reanalysis
         self.db_path = db_path
+        # Reanalysis only touches metadata, so reuse an already open collection
+        # (e.g. the searcher's) instead of loading a full IndexerBackend + CLAP
+        self.collection = collection
     
     def run(self):
-        self.status_update.emit("Loading models for BPM analysis...")
-        indexer = IndexerBackend(db_path=self.db_path) if self.db_path else IndexerBackend()
+        from audio_analysis import reanalyze_bpm_and_key
+        from indexer import open_collection, iter_sample_metadatas, AUDIO_ENGINE
+        collection = self.collection
+        if collection is None:
+            self.signals.status_update.emit("Opening database for BPM analysis...")
+            collection = open_collection(self.db_path) if self.db_path else open_collection()
         
         # Inform user which engine is being used
-        engine_name = indexer.get_audio_engine()
-        self.status_update.emit(f"Using {engine_name} engine for BPM/Key detection")
+        engine_name = AUDIO_ENGINE
+        self.signals.status_update.emit(f"Using {engine_name} engine for BPM/Key detection")
 
-        self.status_update.emit("Fetching samples from database...")
+        self.signals.status_update.emit("Fetching samples from database...")
         try:
-            all_samples = indexer.collection.get()
-            sample_ids = all_samples.get('ids', [])
-            metadatas = all_samples.get('metadatas', [])
-            
-            # Filter samples based on force reanalysis flag
+            # Filter samples based on force reanalysis flag, page by page
+            force = self.force_reanalysis
             samples_to_analyze = []
-            for i, metadata in enumerate(metadatas):
-                if self.force_reanalysis or metadata.get('bpm', 0) == 0 or not metadata.get('key', ''):
-                    samples_to_analyze.append((sample_ids[i], metadata))
+            missing_duration = []  # Samples indexed before durations were stored
+            for sample_id, metadata in iter_sample_metadatas(collection):
+                if metadata.get('duration') is None:
+                    missing_duration.append((sample_id, metadata))
+                if ((force or metadata.get('bpm', 0) == 0 or not metadata.get('key'))
+                        and not is_too_short_wav(sample_id)):
+                    samples_to_analyze.append((sample_id, metadata))
+            
+            if missing_duration:
+                self.signals.status_update.emit(f"Storing durations for {len(missing_duration)} samples...")
+                self.backfill_durations(collection, missing_duration)
             
             total = len(samples_to_analyze)
             if self.force_reanalysis:
-                self.status_update.emit(f"Force reanalyzing BPM and Key for {total} samples...")
+                self.signals.status_update.emit(f"Force reanalyzing BPM and Key for {total} samples...")
             else:
-                self.status_update.emit(f"Found {total} samples without BPM/Key. Analyzing...")
+                self.signals.status_update.emit(f"Found {total} samples without BPM/Key. Analyzing...")
             
             if total == 0:
-                self.finished.emit(0)
+                self.signals.finished.emit(0)
                 return
             
             updated = 0
-            batch_updates = []  # Collect updates for batch processing
+            # Pending updates, kept as the parallel lists collection.update() takes
+            batch_ids, batch_metas = [], []
+            engine_lower = engine_name.lower()  # Track which analysis engine was used
+            emit_progress = throttled_progress(self.signals.progress)
             
-            for i, (file_path, metadata) in enumerate(samples_to_analyze):
-                try:
-                    # Get BPM and Key in one optimized call
-                    bpm, key = indexer.get_bpm_and_key(file_path)
-                    
-                    updated_something = False
-                    if bpm is not None and bpm > 0:
-                        metadata['bpm'] = bpm
-                        updated_something = True
-                    if key is not None:
-                        metadata['key'] = key
-                        updated_something = True
-                    
-                    # Track which analysis engine was used
-                    metadata['analysis_engine'] = indexer.get_audio_engine().lower()
-                    
-                    if updated_something:
-                        batch_updates.append((file_path, metadata))
-                        updated += 1
-                        
-                        # Batch update every 50 samples for efficiency
-                        if len(batch_updates) >= 50:
-                            ids = [item[0] for item in batch_updates]
-                            metas = [item[1] for item in batch_updates]
-                            indexer.collection.update(ids=ids, metadatas=metas)
-                            batch_updates = []
-                except Exception as e:
-                    print(f"Error analyzing {file_path}: {e}")
+            # Files are analyzed in parallel worker processes; metadata updates
+            # and DB writes stay on this thread. The workers only import the
+            # light audio_analysis module, not indexer's torch/CLAP stack.
+            with ProcessPoolExecutor(max_workers=REANALYSIS_WORKERS, initializer=init_analysis_process) as executor:
+                futures = {
+                    # Reanalysis only needs BPM/Key, so this uses the fast low-rate
+                    # path. Unless forced, files whose content hash matches the one
+                    # stored by a previous run (which found no BPM/Key) are skipped.
+                    executor.submit(reanalyze_bpm_and_key, file_path,
+                                    None if self.force_reanalysis else metadata.get('content_hash')):
+                        (file_path, metadata)
+                    for file_path, metadata in samples_to_analyze
+                }
                 
-                # Update progress
-                progress_pct = int(((i + 1) / total) * 100)
-                self.progress.emit(progress_pct)
+                for i, future in enumerate(as_completed(futures)):
+                    file_path, metadata = futures[future]
+                    try:
+                        file_hash, result = future.result()
+                        
+                        updated_something = False
+                        if result is not None:
+                            bpm, key = result
+                            if bpm is not None and bpm > 0:
+                                metadata['bpm'] = bpm
+                                updated_something = True
+                            if key is not None:
+                                metadata['key'] = key
+                                updated_something = True
+                        
+                        if updated_something:
+                            metadata['analysis_engine'] = engine_lower
+                            updated += 1
+                        
+                        # Remember the analyzed content even when nothing was found,
+                        # so the next run can skip it
+                        hash_changed = file_hash is not None and metadata.get('content_hash') != file_hash
+                        if hash_changed:
+                            metadata['content_hash'] = file_hash
+                        
+                        if updated_something or hash_changed:
+                            batch_ids.append(file_path)
+                            batch_metas.append(metadata)
+                            
+                            # Batch updates so each DB commit covers many samples
+                            if len(batch_ids) >= REANALYSIS_UPDATE_BATCH_SIZE:
+                                collection.update(ids=batch_ids, metadatas=batch_metas)
+                                batch_ids, batch_metas = [], []
+                    except Exception as e:
+                        print(f"Error analyzing {file_path}: {e}")
+                    
+                    # Update progress
+                    emit_progress(((i + 1) * 100) // total)
             
             # Update any remaining samples in the batch
-            if batch_updates:
-                ids = [item[0] for item in batch_updates]
-                metas = [item[1] for item in batch_updates]
-                indexer.collection.update(ids=ids, metadatas=metas)
+            if batch_ids:
+                collection.update(ids=batch_ids, metadatas=batch_metas)
             
-            self.status_update.emit(f"Analysis complete! Updated {updated} samples.")
-            self.finished.emit(updated)
+            self.signals.status_update.emit(f"Analysis complete! Updated {updated} samples.")
+            self.signals.finished.emit(updated)
         except Exception as e:
-            self.status_update.emit(f"FATAL ERROR: {e}")
-            self.finished.emit(0)
+            self.signals.status_update.emit(f"FATAL ERROR: {e}")
+            self.signals.finished.emit(0)
 
-class EssentiaWSLWorker(QThread):
-    finished = pyqtSignal(str)
-    status_update = pyqtSignal(str)
-    error = pyqtSignal(str)
+    def backfill_durations(self, collection, samples):
+        """Store the header duration for samples whose metadata lacks one.
 
+        Lets filter_results() filter those samples without opening their files.
+        Files that can't be probed are left as they are.
+        """
+        from audio_analysis import probe_duration
+        batch_ids, batch_metas = [], []
+        for sample_id, metadata in samples:
+            duration = probe_duration(sample_id)
+            if duration is None:
+                continue
+            metadata['duration'] = float(duration)
+            batch_ids.append(sample_id)
+            batch_metas.append(metadata)
+            if len(batch_ids) >= REANALYSIS_UPDATE_BATCH_SIZE:
+                collection.update(ids=batch_ids, metadatas=batch_metas)
+                batch_ids, batch_metas = [], []
+        if batch_ids:
+            collection.update(ids=batch_ids, metadatas=batch_metas)
+
+class EssentiaWSLWorker(QRunnable):
     def __init__(self, db_path=None, force_reanalysis=False):
         super().__init__()
+        self.signals = EssentiaWSLSignals()
         self.db_path = db_path or "./sample_db"
         self.force_reanalysis = force_reanalysis
     
     def run(self):
         import subprocess
         
-        self.status_update.emit("Starting Essentia analysis via WSL...")
-        
-        # Convert Windows path to WSL path
-        wsl_db_path = self.db_path.replace("\\", "/")
-        if len(wsl_db_path) >= 2 and wsl_db_path[1] == ':':
-            drive_letter = wsl_db_path[0].lower()
-            rest_path = wsl_db_path[2:]
-            wsl_db_path = f"/mnt/{drive_letter}{rest_path}"
-        
-        # Get the script path in WSL format
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        script_path = os.path.join(script_dir, "analyze_essentia_wsl.py")
-        wsl_script_path = script_path.replace("\\", "/")
-        if len(wsl_script_path) >= 2 and wsl_script_path[1] == ':':
-            drive_letter = wsl_script_path[0].lower()
-            rest_path = wsl_script_path[2:]
-            wsl_script_path = f"/mnt/{drive_letter}{rest_path}"
-             
-        # Convert env_wsl path to WSL format (it's in the parent directory)
-        project_root = os.path.dirname(script_dir)
-        env_path = os.path.join(project_root, "env_wsl")
-        wsl_env_path = env_path.replace("\\", "/")
-        if len(wsl_env_path) >= 2 and wsl_env_path[1] == ':':
-            drive_letter = wsl_env_path[0].lower()
-            rest_path = wsl_env_path[2:]
-            wsl_env_path = f"/mnt/{drive_letter}{rest_path}"
+        self.signals.status_update.emit("Starting Essentia analysis via WSL...")
+        
+        # Convert Windows paths to WSL paths
+        wsl_db_path = to_wsl_path(self.db_path)
+        wsl_script_path = to_wsl_path(os.path.join(SCRIPT_DIR, "analyze_essentia_wsl.py"))
+        # env_wsl lives in the project root (parent of this directory)
+        wsl_env_path = to_wsl_path(os.path.join(os.path.dirname(SCRIPT_DIR), "env_wsl"))
         
         force_flag = " --force" if self.force_reanalysis else ""
         
@@ -201,29 +311,29 @@ class EssentiaWSLWorker(QThread):
             f"python {wsl_script_path} --db-path {wsl_db_path}{force_flag}"
         ]
         
-        self.status_update.emit(f"Database path (WSL): {wsl_db_path}")
-        self.status_update.emit(f"Script path (WSL): {wsl_script_path}")
-        self.status_update.emit(f"Checking WSL and conda environment...")
+        self.signals.status_update.emit(f"Database path (WSL): {wsl_db_path}")
+        self.signals.status_update.emit(f"Script path (WSL): {wsl_script_path}")
+        self.signals.status_update.emit(f"Checking WSL and conda environment...")
         
         try:
             # First verify WSL is accessible
             test_wsl = subprocess.run(["wsl", "echo", "test"], 
                                      capture_output=True, text=True, encoding='utf-8', timeout=5)
             if test_wsl.returncode != 0:
-                self.error.emit("WSL is not responding. Make sure WSL is installed and running.")
+                self.signals.error.emit("WSL is not responding. Make sure WSL is installed and running.")
                 return
             
-            self.status_update.emit("✓ WSL is accessible")
+            self.signals.status_update.emit("✓ WSL is accessible")
             
             # Check if conda is available (use interactive shell)
-            self.status_update.emit("Checking if conda is available in WSL...")
+            self.signals.status_update.emit("Checking if conda is available in WSL...")
             check_conda = subprocess.run(
                 ["wsl", "bash", "-ic", "which conda"],
                 capture_output=True, text=True, encoding='utf-8', timeout=10
             )
             
             if check_conda.returncode != 0:
-                self.error.emit(
+                self.signals.error.emit(
                     "Conda is not available in WSL.\n\n"
                     "Make sure conda is installed in your WSL distribution.\n\n"
                     "If conda is installed but not found, you may need to:\n"
@@ -232,10 +342,10 @@ class EssentiaWSLWorker(QThread):
                 )
                 return
             
-            self.status_update.emit(f"✓ Conda found at: {check_conda.stdout.strip()}")
+            self.signals.status_update.emit(f"✓ Conda found at: {check_conda.stdout.strip()}")
             
             # Check if conda env exists - try both path and name
-            self.status_update.emit(f"Checking for conda environment at: {wsl_env_path}")
+            self.signals.status_update.emit(f"Checking for conda environment at: {wsl_env_path}")
             check_env = subprocess.run(
                 ["wsl", "bash", "-ic", 
                  f"conda activate {wsl_env_path} 2>/dev/null || conda activate env_wsl && python --version"],
@@ -244,7 +354,7 @@ class EssentiaWSLWorker(QThread):
             
             if check_env.returncode != 0:
                 error_details = check_env.stdout + check_env.stderr
-                self.error.emit(
+                self.signals.error.emit(
                     f"Could not activate conda environment in WSL.\n\n"
                     f"Tried:\n"
                     f"  - Path: {wsl_env_path}\n"
@@ -259,39 +369,53 @@ class EssentiaWSLWorker(QThread):
                 )
                 return
             
-            self.status_update.emit(f"✓ Conda environment is working: {check_env.stdout.strip()}")
-            self.status_update.emit("Starting analysis...")
+            self.signals.status_update.emit(f"✓ Conda environment is working: {check_env.stdout.strip()}")
+            self.signals.status_update.emit("Starting analysis...")
             
-            # Run the WSL command
+            # Run the WSL command (unbuffered bytes; decoded and split below)
             process = subprocess.Popen(
                 cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                text=True,
-                encoding='utf-8',
-                errors='replace',
-                bufsize=1,
-                universal_newlines=True
+                bufsize=0
             )
             
-            # Stream output
-            output_lines = []
-            for line in process.stdout:
-                line = line.rstrip()
-                if line:
-                    output_lines.append(line)
-                    self.status_update.emit(line)
-                    print(f"[WSL] {line}")  # Also print to console
+            # Stream output. tqdm redraws with \r, so split on both line endings.
+            # Every line goes to the console, but the status label only gets the
+            # newest line every STATUS_EMIT_INTERVAL seconds.
+            output_lines = deque(maxlen=20)  # Tail kept for the error message
+            pending = None
+            last_emit = 0.0
+            buffer = b""
+            while True:
+                chunk = process.stdout.read(65536)
+                if chunk:
+                    *lines, buffer = OUTPUT_LINE_SPLIT.split(buffer + chunk)
+                else:
+                    lines, buffer = [buffer], b""
+                for raw in lines:
+                    line = raw.decode('utf-8', errors='replace').rstrip()
+                    if line:
+                        output_lines.append(line)
+                        print(f"[WSL] {line}")  # Also print to console
+                        pending = line
+                now = time.monotonic()
+                if pending and (not chunk or now - last_emit >= STATUS_EMIT_INTERVAL):
+                    self.signals.status_update.emit(pending)
+                    pending = None
+                    last_emit = now
+                if not chunk:
+                    break
             
             process.wait()
             
             if process.returncode == 0:
-                self.finished.emit("Essentia analysis completed successfully!")
+                self.signals.finished.emit("Essentia analysis completed successfully!")
             else:
                 # Capture all output for error message
-                error_output = "\n".join(output_lines[-20:]) if output_lines else "No output"
+                error_output = "\n".join(output_lines) if output_lines else "No output"
                 full_cmd = cmd[-1]  # Get the bash command
-                self.error.emit(
+                self.signals.error.emit(
                     f"WSL process exited with code {process.returncode}\n\n"
                     f"Command:\n{full_cmd}\n\n"
                     f"Last output:\n{error_output}\n\n"
@@ -299,9 +423,9 @@ class EssentiaWSLWorker(QThread):
                 )
         
         except FileNotFoundError:
-            self.error.emit("WSL not found! Make sure WSL is installed and accessible.")
+            self.signals.error.emit("WSL not found! Make sure WSL is installed and accessible.")
         except Exception as e:
-            self.error.emit(f"Error running WSL analysis: {e}")
+            self.signals.error.emit(f"Error running WSL analysis: {e}")
 
 def get_similarity_color(similarity_percent):
     """Returns a color based on similarity percentage using a pleasant gradient."""
@@ -320,7 +444,12 @@ def get_similarity_color(similarity_percent):
 
 def get_gradient_style(similarity_percent):
     """Returns gradient CSS based on similarity percentage."""
-    color = get_similarity_color(similarity_percent)
+    return _gradient_style_for_color(get_similarity_color(similarity_percent))
+
+@lru_cache(maxsize=None)
+def _gradient_style_for_color(color):
+    # Only a handful of colors exist, so each stylesheet is built once and the
+    # same string is handed to every ResultWidget
     # Create darker version for gradient end
     qcolor = QColor(color)
     darker = qcolor.darker(130).name()
@@ -337,6 +466,10 @@ def get_gradient_style(similarity_percent):
         }}
     """
 
+# Result row data roles (UserRole holds the sample's path)
+FILENAME_ROLE = Qt.ItemDataRole.UserRole.value + 1
+BPM_ROLE = Qt.ItemDataRole.UserRole.value + 2
+
 class ResultWidget(QWidget):
     """Custom widget to display filename, similarity score, and progress bar"""
     def __init__(self, filename, similarity_percent, bpm=None, key=None, analysis_engine=None, parent=None):
@@ -358,7 +491,7 @@ class ResultWidget(QWidget):
         
         # Analysis engine badge (if available)
         if analysis_engine:
-            engine_color = "#4a9eff" if analysis_engine == 'essentia' else "#ffaa44"
+            engine_color = "#4a9eff" if analysis_engine.startswith('essentia') else "#ffaa44"
             engine_label = QLabel(f"🔬 {analysis_engine.title()}")
             engine_label.setStyleSheet(f"""
                 color: {engine_color};
@@ -433,13 +566,7 @@ class SampleList(QListWidget):
         self.setDragEnabled(True)
 
     def wsl_to_windows_path(self, wsl_path):
-        if wsl_path.startswith("/mnt/"):
-            parts = wsl_path.split('/')
-            drive_letter = parts[2]    # 'c'
-            rest_of_path = "\\".join(parts[3:])
-            windows_path = f"{drive_letter.upper()}:\\{rest_of_path}"
-            return windows_path
-        return wsl_path
+        return wsl_to_windows_path(wsl_path)
     
     def startDrag(self, supportedActions):
         item = self.currentItem()
@@ -448,10 +575,8 @@ class SampleList(QListWidget):
         
         raw_path = item.data(Qt.ItemDataRole.UserRole)
         print(f"Ruta Linux: {raw_path}")
-        win_path_backslashes = self.wsl_to_windows_path(raw_path)
-        win_path_forward_slashes = win_path_backslashes.replace("\\", "/")
-        final_url_string = f"file:///{win_path_forward_slashes}"
-        url = QUrl(final_url_string)
+        win_path = wsl_to_windows_path(raw_path)
+        url = QUrl.fromLocalFile(win_path.replace("\\", "/"))
         print(f"URL Final: {url.toString()}")
 
         mime_data  = QMimeData()
@@ -461,6 +586,300 @@ class SampleList(QListWidget):
         drag.setMimeData(mime_data)
         drag.exec(Qt.DropAction.CopyAction)
 
+@lru_cache(maxsize=None)
+def app_icon():
+    """The application icon, read from disk once and shared (needs a QApplication)"""
+    return QIcon(os.path.join(SCRIPT_DIR, "icon.ico"))
+
+# Database used when the config doesn't name one
+DEFAULT_DB_PATH = "./sample_db"
+
+@lru_cache(maxsize=None)
+def db_display_name(db_path):
+    """Label for a database in the selector: its folder name, or the path itself"""
+    return os.path.basename(db_path) or db_path
+
+def load_searcher(db_path):
+    """Open db_path with a SampleSearcher.
+
+    searcher/indexer pull in torch, transformers and librosa, so they are
+    imported on first use rather than at startup.
+    """
+    from searcher import SampleSearcher
+    return SampleSearcher(db_path=db_path)
+
+class EngineLoadSignals(QObject):
+    loaded = pyqtSignal(object)  # SampleSearcher
+    failed = pyqtSignal(object)  # the exception load_searcher raised
+
+class EngineLoadWorker(QRunnable):
+    """Runs load_searcher() off the GUI thread (loading CLAP takes seconds)"""
+    def __init__(self, db_path):
+        super().__init__()
+        self.signals = EngineLoadSignals()
+        self.db_path = db_path
+
+    def run(self):
+        try:
+            engine = load_searcher(self.db_path)
+        except Exception as e:
+            self.signals.failed.emit(e)
+            return
+        self.signals.loaded.emit(engine)
+
+# Filter panel styles (applied once on the group box; rules cascade to children)
+FILTER_GROUP_QSS = """
+QGroupBox {
+    color: #cccccc;
+    border: 1px solid #555;
+    border-radius: 5px;
+    margin-top: 25px;
+    padding-top: 20px;
+    font-weight: bold;
+}
+QGroupBox::title {
+    subcontrol-origin: margin;
+    subcontrol-position: top left;
+    left: 10px;
+    padding: 0 5px;
+    margin-top: 5px;
+}
+QGroupBox::indicator {
+    width: 16px;
+    height: 16px;
+    border: 1px solid #555;
+    border-radius: 3px;
+    background-color: #3c3c3c;
+    margin-top: 5px;
+}
+QGroupBox::indicator:checked {
+    background-color: #ff6b35;
+    border-color: #ff6b35;
+}
+QGroupBox::indicator:hover {
+    border-color: #777;
+}
+"""
+
+FILTER_INPUTS_QSS = """
+QLineEdit {
+    background-color: #3c3c3c;
+    border: 1px solid #555;
+    border-radius: 3px;
+    padding: 6px;
+    color: #fff;
+}
+QDoubleSpinBox {
+    background-color: #3c3c3c;
+    border: 1px solid #555;
+    border-radius: 3px;
+    padding: 5px;
+    color: #fff;
+    min-width: 90px;
+}
+QDoubleSpinBox::up-button, QDoubleSpinBox::down-button {
+    width: 20px;
+    height: 14px;
+    background-color: #555;
+    border: none;
+}
+QDoubleSpinBox::up-button:hover, QDoubleSpinBox::down-button:hover {
+    background-color: #666;
+}
+QComboBox {
+    background-color: #3c3c3c;
+    border: 1px solid #555;
+    border-radius: 3px;
+    padding: 6px;
+    color: #fff;
+    min-width: 120px;
+}
+QComboBox::drop-down { border: none; }
+QComboBox QAbstractItemView {
+    background-color: #2c2c2c;
+    color: #fff;
+    selection-background-color: #006bb3;
+    padding: 4px;
+}
+"""
+
+# Filter combo choices ("All" = no filter)
+KEY_FILTER_OPTIONS = ("All", "C maj", "C min", "C# maj", "C# min", "D maj", "D min", "D# maj", "D# min",
+                      "E maj", "E min", "F maj", "F min", "F# maj", "F# min", "G maj", "G min",
+                      "G# maj", "G# min", "A maj", "A min", "A# maj", "A# min", "B maj", "B min")
+FORMAT_FILTER_OPTIONS = ("All", "wav", "mp3", "aif", "aiff", "flac", "ogg", "opus", "m4a", "aac")
+
+@lru_cache(maxsize=64)
+def compile_filter_pattern(pattern):
+    """Compile an include/exclude filter regex once per distinct pattern.
+
+    Returns None for an empty or invalid pattern (the filter is then skipped).
+    """
+    if not pattern:
+        return None
+    try:
+        return re.compile(pattern, re.IGNORECASE)
+    except re.error:
+        return None
+
+def unfiltered_results(results):
+    """filter_results() output when no filter is active: every row, with its similarity %"""
+    return [({'filename': item['filename'], 'route': item['route'], 'score': item['score'],
+              'metadata': item.get('metadata', {})},
+             max(0, min(100, (1 - item['score'] / 2) * 100)))
+            for item in results]
+
+def filter_results(results, settings):
+    """Apply a MainWindow.filter_settings() snapshot to search results.
+
+    Reads no widgets, so it can run on the search thread.
+    Returns [(item, similarity_percent)].
+    """
+    if settings is None:
+        return unfiltered_results(results)
+    
+    filtered = []
+    include_re = settings['include_re']
+    exclude_re = settings['exclude_re']
+    min_dur, max_dur = settings['min_dur'], settings['max_dur']
+    format_filter = settings['format_filter']
+    min_sim, max_sim = settings['min_sim'], settings['max_sim']
+    min_bpm_val, max_bpm_val = settings['min_bpm_val'], settings['max_bpm_val']
+    key_filter = settings['key_filter']
+    sim_active = settings['sim_active']
+    format_active = settings['format_active']
+    bpm_active = settings['bpm_active']
+    key_active = settings['key_active']
+    duration_active = settings['duration_active']
+    if duration_active:
+        from audio_analysis import probe_duration
+    
+    for item in results:
+        filename = item['filename']
+        full_path = item['route']
+        distance = item['score']
+        metadata = item.get('metadata', {})
+        similarity_percent = max(0, min(100, (1 - distance / 2) * 100))
+        
+        # Build item with metadata for later use
+        item_with_meta = {
+            'filename': filename,
+            'route': full_path,
+            'score': distance,
+            'metadata': metadata
+        }
+        
+        # Filter by similarity
+        if sim_active and (similarity_percent < min_sim or similarity_percent > max_sim):
+            continue
+        
+        # Filter by include pattern
+        if include_re and not include_re.search(filename):
+            continue
+        
+        # Filter by exclude pattern
+        if exclude_re and exclude_re.search(filename):
+            continue
+        
+        # Filter by format
+        if format_active:
+            file_ext = os.path.splitext(filename)[1].lower().strip('.')
+            if file_ext != format_filter:
+                continue
+        
+        # Filter by BPM
+        if bpm_active:
+            bpm = item.get('metadata', {}).get('bpm', 0)
+            if bpm is None:
+                bpm = 0
+            if bpm > 0:  # Only filter samples that have BPM detected
+                if bpm < min_bpm_val or bpm > max_bpm_val:
+                    continue
+        
+        # Filter by Key
+        if key_active:
+            sample_key = item.get('metadata', {}).get('key', '')
+            if sample_key != key_filter:
+                continue
+        
+        # Filter by duration (samples whose duration is unknown are kept)
+        if duration_active:
+            duration = metadata.get('duration')
+            if duration is None:
+                # Indexed before durations were stored: read the file header
+                check_path = full_path
+                if check_path.startswith("/mnt/"):
+                    check_path = wsl_to_windows_path(check_path)
+                duration = probe_duration(check_path)
+            if duration is not None and (duration < min_dur or duration > max_dur):
+                continue
+        
+        filtered.append((item_with_meta, similarity_percent))
+    
+    return filtered
+
+class SearchSignals(QObject):
+    results_ready = pyqtSignal(int, object)  # search id, filter_results() output
+
+class SearchWorker(QRunnable):
+    """Runs engine.search() and filter_results() off the GUI thread"""
+    def __init__(self, search_id, engine, query, top_k, filter_settings):
+        super().__init__()
+        self.signals = SearchSignals()
+        self.search_id = search_id
+        self.engine = engine
+        self.query = query
+        self.top_k = top_k
+        self.filter_settings = filter_settings
+
+    def run(self):
+        # Get more results than requested to account for filtering
+        fetch_k = min(100, self.top_k * 3)  # Fetch 3x to ensure enough after filtering
+        try:
+            where = self.filter_settings['where'] if self.filter_settings else None
+            results = self.engine.search(self.query, top_k=fetch_k, where=where)
+            # Limit to requested count
+            results = filter_results(results, self.filter_settings)[:self.top_k]
+        except Exception as e:
+            print(f"Search failed: {e}")
+            results = []
+        self.signals.results_ready.emit(self.search_id, results)
+
+# After each search, the first bytes of this many top results are read ahead
+PREVIEW_PREFETCH_COUNT = 10
+PREVIEW_PREFETCH_BYTES = 128 * 1024
+
+class PreviewPrefetchWorker(QRunnable):
+    """Reads the head of the top results so the OS has them cached before a click.
+
+    Matters for WSL/network paths, where the first read of a file is slow and
+    would otherwise delay the preview.
+    """
+    def __init__(self, file_paths):
+        super().__init__()
+        self.file_paths = file_paths
+
+    def run(self):
+        for file_path in self.file_paths:
+            try:
+                with open(file_path, 'rb') as f:
+                    f.read(PREVIEW_PREFETCH_BYTES)
+            except OSError:
+                pass
+
+# Quiet period after the last filter edit before the search reruns
+SEARCH_DEBOUNCE_MS = 150
+
+# Delay before pending config changes are written to disk
+CONFIG_FLUSH_DELAY_MS = 1000
+
+# Playback slider refresh interval while playing (~30 Hz)
+POSITION_POLL_INTERVAL_MS = 33
+# Minimum interval between volume changes while the slider is dragged (~30 Hz)
+VOLUME_APPLY_INTERVAL_MS = 33
+# The ETA uses the progress rate over this many recent seconds (not since the start)
+PROGRESS_RATE_WINDOW = 10.0
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -471,13 +890,18 @@ class MainWindow(QMainWindow):
         
         # Database path selection and config
         self.config_file = os.path.join(os.path.dirname(__file__), 'db_config.json')
+        # save_config() only marks the config dirty; writes are coalesced by this
+        # timer and forced out on quit
+        self.config_dirty = False
+        self.config_flush_timer = QTimer(self)
+        self.config_flush_timer.setSingleShot(True)
+        self.config_flush_timer.setInterval(CONFIG_FLUSH_DELAY_MS)
+        self.config_flush_timer.timeout.connect(self.flush_config)
+        QApplication.instance().aboutToQuit.connect(self.flush_config)
         self.load_config()
-        from indexer import DB_PATH as DEFAULT_DB_PATH
         self.current_db_path = self.config.get('last_used', DEFAULT_DB_PATH)
         
-        basedir = os.path.dirname(__file__)
-        icon_path = os.path.join(basedir, "icon.ico")
-        self.setWindowIcon(QIcon(icon_path))
+        self.setWindowIcon(app_icon())
         self.resize(1100, 800)
         self.setMinimumSize(1100, 800)  # Minimum size to keep all elements visible
         self.setWindowFlags(Qt.WindowType.WindowStaysOnTopHint)
@@ -488,7 +912,7 @@ class MainWindow(QMainWindow):
         self.last_progress_message = ""  # Cache the last progress message
 
         try: 
-            self.engine = SampleSearcher(db_path=self.current_db_path)
+            self.engine = load_searcher(self.current_db_path)
             print("DB Loaded succesfuly")
             db_exists = True
             # Update window title with audio engine info
@@ -505,9 +929,14 @@ class MainWindow(QMainWindow):
         self.audio_ouput.setVolume(0.8)
         self.current_playing_filename = ""
         self.slider_is_pressed = False
-        
-        # Connect player signals
-        self.player.positionChanged.connect(self.update_playback_position)
+        self.shown_position_sec = 0  # Whole seconds currently shown in time_label
+        self.shown_slider_value = 0  # Last position update_playback_position gave the slider
+        
+        # Connect player signals. Position is polled at ~30 Hz while playing
+        # instead of following positionChanged, which can fire far more often.
+        self.position_timer = QTimer(self)
+        self.position_timer.setInterval(POSITION_POLL_INTERVAL_MS)
+        self.position_timer.timeout.connect(self.poll_playback_position)
         self.player.durationChanged.connect(self.update_playback_duration)
         self.player.playbackStateChanged.connect(self.handle_playback_state_changed)
 
@@ -676,6 +1105,18 @@ class MainWindow(QMainWindow):
         self.status_label.setStyleSheet("font-size: 10pt; color: #555; padding: 8px 0px; margin-bottom: 15px;")
         main_layout.addWidget(self.status_label)
 
+        # Filter edits restart this timer, so a burst of changes (tabbing
+        # through fields, Enter + focus loss) runs a single search
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.do_search)
+        # One search at a time (they share the model); results carry search_id
+        # so only the latest search is shown
+        self.search_pool = QThreadPool(self)
+        self.search_pool.setMaxThreadCount(1)
+        self.search_id = 0
+
         # Filters Panel
         self.create_filters_panel(main_layout)
 
@@ -719,10 +1160,12 @@ class MainWindow(QMainWindow):
     
     def load_config(self):
         """Load database configuration from JSON file"""
+        self.saved_config_text = None  # Serialized config as last written/read
         try:
             if os.path.exists(self.config_file):
                 with open(self.config_file, 'r') as f:
                     self.config = json.load(f)
+                self.saved_config_text = json.dumps(self.config, indent=2)
             else:
                 # Create default config
                 self.config = {
@@ -738,10 +1181,25 @@ class MainWindow(QMainWindow):
             }
     
     def save_config(self):
-        """Save database configuration to JSON file"""
+        """Schedule a write of the database configuration (see flush_config)"""
+        self.config_dirty = True
+        self.config_flush_timer.start()
+
+    def flush_config(self):
+        """Write the database configuration to JSON file if it has pending changes"""
+        if not self.config_dirty:
+            return
+        self.config_flush_timer.stop()
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.config, f, indent=2)
+            config_text = json.dumps(self.config, indent=2)
+            if config_text != self.saved_config_text:
+                # Write to a temp file and swap it in so a crash can't leave a torn config
+                tmp_path = self.config_file + '.tmp'
+                with open(tmp_path, 'w') as f:
+                    f.write(config_text)
+                os.replace(tmp_path, self.config_file)
+                self.saved_config_text = config_text
+            self.config_dirty = False
         except Exception as e:
             print(f"Error saving config: {e}")
     
@@ -753,24 +1211,45 @@ class MainWindow(QMainWindow):
     
     def populate_database_selector(self):
         """Populate database selector from config"""
-        self.db_selector.clear()
-        
-        # Add all databases from config
-        for db_path in self.config.get('databases', []):
-            # Show relative path with db name
-            display_name = os.path.basename(db_path) if db_path else db_path
-            if not display_name:
-                display_name = db_path
-            self.db_selector.addItem(display_name, db_path)
-        
-        # Add "Browse..." option
-        self.db_selector.addItem("Browse...", None)
+        # clear()/addItem() move the current index; don't let that reach
+        # on_database_changed
+        with QSignalBlocker(self.db_selector):
+            self.db_selector.clear()
+            
+            # Add all databases from config, remembering each one's combo index
+            self.db_index = {}
+            for db_path in self.config.get('databases', []):
+                self.db_index.setdefault(db_path, self.db_selector.count())
+                self.db_selector.addItem(db_display_name(db_path), db_path)
+            
+            # Add "Browse..." option
+            self.db_selector.addItem("Browse...", None)
         
         # Select current database
-        for i in range(self.db_selector.count()):
-            if self.db_selector.itemData(i) == self.current_db_path:
-                self.db_selector.setCurrentIndex(i)
-                break
+        self.select_current_database()
+    
+    def add_database_to_selector(self, db_path):
+        """Insert db_path just above "Browse..." (if not listed yet) and select it.
+
+        Signals are blocked so this doesn't re-enter on_database_changed.
+        """
+        with QSignalBlocker(self.db_selector):
+            index = self.db_index.get(db_path)
+            if index is None:
+                index = self.db_selector.count() - 1  # "Browse..." is always last
+                self.db_selector.insertItem(index, db_display_name(db_path), db_path)
+                self.db_index[db_path] = index
+            self.db_selector.setCurrentIndex(index)
+    
+    def select_current_database(self):
+        """Point the selector at current_db_path (no-op if it isn't listed).
+
+        Also used to revert the selector, so on_database_changed isn't re-entered.
+        """
+        index = self.db_index.get(self.current_db_path)
+        if index is not None:
+            with QSignalBlocker(self.db_selector):
+                self.db_selector.setCurrentIndex(index)
     
     def on_database_changed(self, index):
         """Handle database selection change"""
@@ -786,106 +1265,146 @@ class MainWindow(QMainWindow):
                 self.current_db_path = new_db_path
                 
                 try:
-                    # Test if database is valid
-                    test_engine = SampleSearcher(db_path=new_db_path)
+                    # Loading the searcher validates the database; keep it
+                    # rather than loading it a second time
+                    self.engine = load_searcher(new_db_path)
                     # If successful, add to config and update selector
                     self.add_database_to_config(new_db_path)
                     self.config['last_used'] = new_db_path
                     self.save_config()
-                    self.populate_database_selector()
-                    self.reload_search_engine()
+                    self.add_database_to_selector(new_db_path)
+                    self.on_engine_loaded()
                 except Exception as e:
                     # Failed to load, revert
                     self.current_db_path = temp_current
                     QMessageBox.warning(self, "Invalid Database", 
                                       f"Could not load database at:\n{new_db_path}\n\nError: {e}")
                     # Revert selector
-                    for i in range(self.db_selector.count()):
-                        if self.db_selector.itemData(i) == self.current_db_path:
-                            self.db_selector.setCurrentIndex(i)
-                            break
+                    self.select_current_database()
             else:
                 # User cancelled, revert to previous selection
-                for i in range(self.db_selector.count()):
-                    if self.db_selector.itemData(i) == self.current_db_path:
-                        self.db_selector.setCurrentIndex(i)
-                        break
+                self.select_current_database()
         else:
             # Regular database selected
             new_db_path = selected_data
             if new_db_path != self.current_db_path:
+                previous_db_path = self.current_db_path
                 self.current_db_path = new_db_path
                 self.config['last_used'] = new_db_path
                 self.save_config()
-                self.reload_search_engine()
+                self.reload_search_engine(previous_db_path)
     
-    def reload_search_engine(self):
-        """Reload the search engine with the selected database"""
+    def set_database_actions_enabled(self, enabled):
+        """Enable/disable the buttons that index or analyze current_db_path.
+
+        They are never enabled while indexing/analysis runs (its progress bar is
+        shown); end_background_task() re-enables them when that finishes.
+        """
+        enabled = enabled and self.progress_bar.isHidden()
+        self.btn_index.setEnabled(enabled)
+        self.btn_reanalyze.setEnabled(enabled)
+        self.btn_essentia_wsl.setEnabled(enabled)
+        self.force_reanalysis_checkbox.setEnabled(enabled)
+
+    def reload_search_engine(self, previous_db_path=None):
+        """Load the selected database on a worker thread.
+
+        The selector stays disabled until the load finishes, so a second switch
+        can't start another SampleSearcher while this one is being built. If the
+        load fails, the previous engine and previous_db_path are restored.
+        """
         self.status_label.setText(f"Loading database: {self.current_db_path}")
-        try:
-            self.engine = SampleSearcher(db_path=self.current_db_path)
-            self.search_bar.setEnabled(True)
-            self.search_bar.setPlaceholderText("Describe Sound: ")
-            self.btn_reanalyze.setEnabled(True)
-            self.btn_essentia_wsl.setEnabled(True)
-            self.force_reanalysis_checkbox.setEnabled(True)
-            self.status_label.setText(f"Database loaded: {os.path.basename(self.current_db_path)}")
-            print(f"Successfully loaded database: {self.current_db_path}")
-            # Clear current results
-            self.result_list.clear()
-        except FileNotFoundError:
+        # The old engine stays in self.engine until the new one replaces it (or
+        # is kept if the load fails); the CLAP model itself is shared between them
+        self.previous_db_path = previous_db_path
+        self.db_selector.setEnabled(False)
+        self.search_bar.setEnabled(False)
+        # self.engine and current_db_path disagree until the load finishes
+        self.set_database_actions_enabled(False)
+        self.engine_worker = EngineLoadWorker(self.current_db_path)
+        self.engine_worker.signals.loaded.connect(self.on_engine_reloaded)
+        self.engine_worker.signals.failed.connect(self.on_engine_load_failed)
+        QThreadPool.globalInstance().start(self.engine_worker)
+
+    def on_engine_reloaded(self, engine):
+        self.db_selector.setEnabled(True)
+        self.engine = engine
+        self.on_engine_loaded()
+
+    def on_engine_load_failed(self, e):
+        self.db_selector.setEnabled(True)
+        if isinstance(e, FileNotFoundError):
             self.engine = None
             self.search_bar.setEnabled(False)
             self.search_bar.setPlaceholderText("Please index a folder first...")
-            self.btn_reanalyze.setEnabled(False)
-            self.btn_essentia_wsl.setEnabled(False)
-            self.force_reanalysis_checkbox.setEnabled(False)
+            self.set_database_actions_enabled(False)
+            # Indexing a folder is how the missing database gets created
+            self.btn_index.setEnabled(self.progress_bar.isHidden())
             self.status_label.setText(f"No database found at: {self.current_db_path}")
             print(f"No database found at: {self.current_db_path}")
             QMessageBox.warning(self, "Database Not Found", 
                               f"No database found at:\n{self.current_db_path}\n\nPlease index a folder first.")
-        except Exception as e:
+        else:
+            failed_db_path = self.current_db_path
+            if self.engine is not None and self.previous_db_path:
+                # Keep searching with the previously loaded engine: point the
+                # selector and config back at its database, as Browse does
+                self.current_db_path = self.previous_db_path
+                self.config['last_used'] = self.previous_db_path
+                self.save_config()
+                self.select_current_database()
+                self.search_bar.setEnabled(True)
+                self.set_database_actions_enabled(True)
+            else:
+                # Nothing to fall back to; indexing can still create the database
+                self.btn_index.setEnabled(self.progress_bar.isHidden())
             self.status_label.setText(f"Error loading database: {e}")
-            print(f"Error loading database {self.current_db_path}: {e}")
+            print(f"Error loading database {failed_db_path}: {e}")
             QMessageBox.critical(self, "Error", f"Failed to load database:\n{e}")
 
+    def on_engine_loaded(self):
+        """Update the UI after self.engine was loaded for current_db_path"""
+        self.search_bar.setEnabled(True)
+        self.search_bar.setPlaceholderText("Describe Sound: ")
+        self.set_database_actions_enabled(True)
+        self.status_label.setText(f"Database loaded: {db_display_name(self.current_db_path)}")
+        print(f"Successfully loaded database: {self.current_db_path}")
+        # Clear current results, and drop any still coming from the old engine
+        self.search_id += 1
+        self.result_list.clear()
+
     def create_filters_panel(self, parent_layout):
         """Create collapsible filter panel"""
         self.filter_group = QGroupBox("🔍 Advanced Filters")
         self.filter_group.setCheckable(True)
         self.filter_group.setChecked(False)  # Collapsed by default
-        self.filter_group.setStyleSheet("""
-            QGroupBox {
-                color: #cccccc;
-                border: 1px solid #555;
-                border-radius: 5px;
-                margin-top: 25px;
-                padding-top: 20px;
-                font-weight: bold;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                subcontrol-position: top left;
-                left: 10px;
-                padding: 0 5px;
-                margin-top: 5px;
-            }
-            QGroupBox::indicator {
-                width: 16px;
-                height: 16px;
-                border: 1px solid #555;
-                border-radius: 3px;
-                background-color: #3c3c3c;
-                margin-top: 5px;
-            }
-            QGroupBox::indicator:checked {
-                background-color: #ff6b35;
-                border-color: #ff6b35;
-            }
-            QGroupBox::indicator:hover {
-                border-color: #777;
-            }
-        """)
+        # One sheet for the group and all its inputs, so Qt parses the shared
+        # input rules once instead of once per widget
+        self.filter_group.setStyleSheet(FILTER_GROUP_QSS + FILTER_INPUTS_QSS)
+        # Most sessions never open the filters, so the widgets are only built
+        # the first time the group is checked (filter_settings() reports defaults
+        # until then)
+        self.filters_built = False
+        self.filter_group.toggled.connect(self.build_filter_widgets)
+        parent_layout.addWidget(self.filter_group)
+
+    def make_range_spin(self, lo, hi, default, suffix):
+        """One end of a min/max filter range; edits schedule a search"""
+        spin = QDoubleSpinBox()
+        spin.setRange(lo, hi)
+        spin.setValue(default)
+        spin.setSuffix(suffix)
+        spin.setDecimals(1)
+        spin.setKeyboardTracking(True)
+        spin.setButtonSymbols(QDoubleSpinBox.ButtonSymbols.UpDownArrows)
+        spin.editingFinished.connect(self.schedule_search)
+        return spin
+
+    def build_filter_widgets(self, checked):
+        """Populate the filter group on its first expansion"""
+        if not checked or self.filters_built:
+            return
+        self.filters_built = True
         
         filter_layout = QVBoxLayout()
         filter_layout.setSpacing(12)
@@ -903,9 +1422,7 @@ class MainWindow(QMainWindow):
         
         self.include_pattern = QLineEdit()
         self.include_pattern.setPlaceholderText("e.g., kick, snare (regex)")
-        self.include_pattern.setStyleSheet("background-color: #3c3c3c; border: 1px solid #555; border-radius: 3px; padding: 6px; color: #fff;")
-        self.include_pattern.returnPressed.connect(self.do_search)
-        self.include_pattern.editingFinished.connect(self.do_search)
+        self.include_pattern.editingFinished.connect(self.schedule_search)  # Also fires on Enter
         include_box.addWidget(self.include_pattern)
         text_section.addLayout(include_box, 1)
         
@@ -918,9 +1435,7 @@ class MainWindow(QMainWindow):
         
         self.exclude_pattern = QLineEdit()
         self.exclude_pattern.setPlaceholderText("e.g., loop, one-shot")
-        self.exclude_pattern.setStyleSheet("background-color: #3c3c3c; border: 1px solid #555; border-radius: 3px; padding: 6px; color: #fff;")
-        self.exclude_pattern.returnPressed.connect(self.do_search)
-        self.exclude_pattern.editingFinished.connect(self.do_search)
+        self.exclude_pattern.editingFinished.connect(self.schedule_search)
         exclude_box.addWidget(self.exclude_pattern)
         text_section.addLayout(exclude_box, 1)
         
@@ -944,62 +1459,10 @@ class MainWindow(QMainWindow):
         
         similarity_range = QHBoxLayout()
         similarity_range.setSpacing(5)
-        self.min_similarity = QDoubleSpinBox()
-        self.min_similarity.setRange(0, 100)
-        self.min_similarity.setValue(0)
-        self.min_similarity.setSuffix("% min")
-        self.min_similarity.setDecimals(1)
-        self.min_similarity.setKeyboardTracking(True)
-        self.min_similarity.setButtonSymbols(QDoubleSpinBox.ButtonSymbols.UpDownArrows)
-        self.min_similarity.setStyleSheet("""
-            QDoubleSpinBox {
-                background-color: #3c3c3c;
-                border: 1px solid #555;
-                border-radius: 3px;
-                padding: 5px;
-                color: #fff;
-                min-width: 90px;
-            }
-            QDoubleSpinBox::up-button, QDoubleSpinBox::down-button {
-                width: 20px;
-                height: 14px;
-                background-color: #555;
-                border: none;
-            }
-            QDoubleSpinBox::up-button:hover, QDoubleSpinBox::down-button:hover {
-                background-color: #666;
-            }
-        """)
-        self.min_similarity.editingFinished.connect(self.do_search)
+        self.min_similarity = self.make_range_spin(0, 100, 0, "% min")
         similarity_range.addWidget(self.min_similarity)
         
-        self.max_similarity = QDoubleSpinBox()
-        self.max_similarity.setRange(0, 100)
-        self.max_similarity.setValue(100)
-        self.max_similarity.setSuffix("% max")
-        self.max_similarity.setDecimals(1)
-        self.max_similarity.setKeyboardTracking(True)
-        self.max_similarity.setButtonSymbols(QDoubleSpinBox.ButtonSymbols.UpDownArrows)
-        self.max_similarity.setStyleSheet("""
-            QDoubleSpinBox {
-                background-color: #3c3c3c;
-                border: 1px solid #555;
-                border-radius: 3px;
-                padding: 5px;
-                color: #fff;
-                min-width: 90px;
-            }
-            QDoubleSpinBox::up-button, QDoubleSpinBox::down-button {
-                width: 20px;
-                height: 14px;
-                background-color: #555;
-                border: none;
-            }
-            QDoubleSpinBox::up-button:hover, QDoubleSpinBox::down-button:hover {
-                background-color: #666;
-            }
-        """)
-        self.max_similarity.editingFinished.connect(self.do_search)
+        self.max_similarity = self.make_range_spin(0, 100, 100, "% max")
         similarity_range.addWidget(self.max_similarity)
         grid_layout.addLayout(similarity_range, 1, 0)
         
@@ -1010,62 +1473,10 @@ class MainWindow(QMainWindow):
         
         bpm_range = QHBoxLayout()
         bpm_range.setSpacing(5)
-        self.min_bpm = QDoubleSpinBox()
-        self.min_bpm.setRange(0, 300)
-        self.min_bpm.setValue(0)
-        self.min_bpm.setSuffix(" min")
-        self.min_bpm.setDecimals(1)
-        self.min_bpm.setKeyboardTracking(True)
-        self.min_bpm.setButtonSymbols(QDoubleSpinBox.ButtonSymbols.UpDownArrows)
-        self.min_bpm.setStyleSheet("""
-            QDoubleSpinBox {
-                background-color: #3c3c3c;
-                border: 1px solid #555;
-                border-radius: 3px;
-                padding: 5px;
-                color: #fff;
-                min-width: 90px;
-            }
-            QDoubleSpinBox::up-button, QDoubleSpinBox::down-button {
-                width: 20px;
-                height: 14px;
-                background-color: #555;
-                border: none;
-            }
-            QDoubleSpinBox::up-button:hover, QDoubleSpinBox::down-button:hover {
-                background-color: #666;
-            }
-        """)
-        self.min_bpm.editingFinished.connect(self.do_search)
+        self.min_bpm = self.make_range_spin(0, 300, 0, " min")
         bpm_range.addWidget(self.min_bpm)
         
-        self.max_bpm = QDoubleSpinBox()
-        self.max_bpm.setRange(0, 300)
-        self.max_bpm.setValue(300)
-        self.max_bpm.setSuffix(" max")
-        self.max_bpm.setDecimals(1)
-        self.max_bpm.setKeyboardTracking(True)
-        self.max_bpm.setButtonSymbols(QDoubleSpinBox.ButtonSymbols.UpDownArrows)
-        self.max_bpm.setStyleSheet("""
-            QDoubleSpinBox {
-                background-color: #3c3c3c;
-                border: 1px solid #555;
-                border-radius: 3px;
-                padding: 5px;
-                color: #fff;
-                min-width: 90px;
-            }
-            QDoubleSpinBox::up-button, QDoubleSpinBox::down-button {
-                width: 20px;
-                height: 14px;
-                background-color: #555;
-                border: none;
-            }
-            QDoubleSpinBox::up-button:hover, QDoubleSpinBox::down-button:hover {
-                background-color: #666;
-            }
-        """)
-        self.max_bpm.editingFinished.connect(self.do_search)
+        self.max_bpm = self.make_range_spin(0, 300, 300, " max")
         bpm_range.addWidget(self.max_bpm)
         grid_layout.addLayout(bpm_range, 1, 1)
         
@@ -1076,62 +1487,10 @@ class MainWindow(QMainWindow):
         
         duration_range = QHBoxLayout()
         duration_range.setSpacing(5)
-        self.min_duration = QDoubleSpinBox()
-        self.min_duration.setRange(0, 999)
-        self.min_duration.setValue(0)
-        self.min_duration.setSuffix(" min")
-        self.min_duration.setDecimals(1)
-        self.min_duration.setKeyboardTracking(True)
-        self.min_duration.setButtonSymbols(QDoubleSpinBox.ButtonSymbols.UpDownArrows)
-        self.min_duration.setStyleSheet("""
-            QDoubleSpinBox {
-                background-color: #3c3c3c;
-                border: 1px solid #555;
-                border-radius: 3px;
-                padding: 5px;
-                color: #fff;
-                min-width: 90px;
-            }
-            QDoubleSpinBox::up-button, QDoubleSpinBox::down-button {
-                width: 20px;
-                height: 14px;
-                background-color: #555;
-                border: none;
-            }
-            QDoubleSpinBox::up-button:hover, QDoubleSpinBox::down-button:hover {
-                background-color: #666;
-            }
-        """)
-        self.min_duration.editingFinished.connect(self.do_search)
+        self.min_duration = self.make_range_spin(0, 999, 0, " min")
         duration_range.addWidget(self.min_duration)
         
-        self.max_duration = QDoubleSpinBox()
-        self.max_duration.setRange(0, 999)
-        self.max_duration.setValue(999)
-        self.max_duration.setSuffix(" max")
-        self.max_duration.setDecimals(1)
-        self.max_duration.setKeyboardTracking(True)
-        self.max_duration.setButtonSymbols(QDoubleSpinBox.ButtonSymbols.UpDownArrows)
-        self.max_duration.setStyleSheet("""
-            QDoubleSpinBox {
-                background-color: #3c3c3c;
-                border: 1px solid #555;
-                border-radius: 3px;
-                padding: 5px;
-                color: #fff;
-                min-width: 90px;
-            }
-            QDoubleSpinBox::up-button, QDoubleSpinBox::down-button {
-                width: 20px;
-                height: 14px;
-                background-color: #555;
-                border: none;
-            }
-            QDoubleSpinBox::up-button:hover, QDoubleSpinBox::down-button:hover {
-                background-color: #666;
-            }
-        """)
-        self.max_duration.editingFinished.connect(self.do_search)
+        self.max_duration = self.make_range_spin(0, 999, 999, " max")
         duration_range.addWidget(self.max_duration)
         grid_layout.addLayout(duration_range, 1, 2)
         
@@ -1155,28 +1514,8 @@ class MainWindow(QMainWindow):
         key_box.addWidget(key_label)
         
         self.key_filter = QComboBox()
-        keys = ["All", "C maj", "C min", "C# maj", "C# min", "D maj", "D min", "D# maj", "D# min",
-                "E maj", "E min", "F maj", "F min", "F# maj", "F# min", "G maj", "G min",
-                "G# maj", "G# min", "A maj", "A min", "A# maj", "A# min", "B maj", "B min"]
-        self.key_filter.addItems(keys)
-        self.key_filter.currentIndexChanged.connect(self.do_search)
-        self.key_filter.setStyleSheet("""
-            QComboBox {
-                background-color: #3c3c3c;
-                border: 1px solid #555;
-                border-radius: 3px;
-                padding: 6px;
-                color: #fff;
-                min-width: 120px;
-            }
-            QComboBox::drop-down { border: none; }
-            QComboBox QAbstractItemView {
-                background-color: #2c2c2c;
-                color: #fff;
-                selection-background-color: #006bb3;
-                padding: 4px;
-            }
-        """)
+        self.key_filter.addItems(KEY_FILTER_OPTIONS)
+        self.key_filter.currentIndexChanged.connect(self.schedule_search)
         key_box.addWidget(self.key_filter)
         musical_section.addLayout(key_box, 1)
         
@@ -1188,25 +1527,8 @@ class MainWindow(QMainWindow):
         format_box.addWidget(format_label)
         
         self.format_combo = QComboBox()
-        self.format_combo.addItems(["All", "wav", "mp3", "aif", "aiff", "flac", "ogg", "opus", "m4a", "aac"])
-        self.format_combo.currentIndexChanged.connect(self.do_search)
-        self.format_combo.setStyleSheet("""
-            QComboBox {
-                background-color: #3c3c3c;
-                border: 1px solid #555;
-                border-radius: 3px;
-                padding: 6px;
-                color: #fff;
-                min-width: 120px;
-            }
-            QComboBox::drop-down { border: none; }
-            QComboBox QAbstractItemView {
-                background-color: #2c2c2c;
-                color: #fff;
-                selection-background-color: #006bb3;
-                padding: 4px;
-            }
-        """)
+        self.format_combo.addItems(FORMAT_FILTER_OPTIONS)
+        self.format_combo.currentIndexChanged.connect(self.schedule_search)
         format_box.addWidget(self.format_combo)
         musical_section.addLayout(format_box, 1)
         
@@ -1242,7 +1564,6 @@ class MainWindow(QMainWindow):
         filter_layout.addLayout(musical_section)
         
         self.filter_group.setLayout(filter_layout)
-        parent_layout.addWidget(self.filter_group)
     
     def create_playback_panel(self, parent_layout):
         """Create playback control panel at bottom"""
@@ -1381,6 +1702,12 @@ class MainWindow(QMainWindow):
         self.volume_slider.setValue(80)
         self.volume_slider.setMaximumWidth(100)
         self.volume_slider.valueChanged.connect(self.change_volume)
+        # Dragging emits valueChanged for every step; apply the latest value at
+        # most once per interval
+        self.volume_timer = QTimer(self)
+        self.volume_timer.setSingleShot(True)
+        self.volume_timer.setInterval(VOLUME_APPLY_INTERVAL_MS)
+        self.volume_timer.timeout.connect(self.apply_volume)
         self.volume_slider.setStyleSheet("""
             QSlider::groove:horizontal {
                 border: 1px solid #444;
@@ -1429,13 +1756,15 @@ class MainWindow(QMainWindow):
         self.key_filter.setCurrentIndex(0)
         # Refresh search results if a search has been performed
         if self.result_list.count() > 0:
-            self.do_search()
+            self.schedule_search()
 
     def update_status_label(self, message):
         # If we're actively showing progress with time estimation, don't overwrite it
         # Only update status when not in progress mode or if progress hasn't been displayed yet
         if self.progress_start_time is None or self.last_progress_value == 0:
-            self.status_label.setText(message)
+            # Workers repeat messages; skip the relayout/repaint for identical text
+            if self.status_label.text() != message:
+                self.status_label.setText(message)
 
     def open_folder_dialog(self):
         folder = QFileDialog.getExistingDirectory(self, "Select Sample Folder")
@@ -1466,10 +1795,10 @@ class MainWindow(QMainWindow):
         self.last_progress_message = ""
 
         self.worker = IndexingWorker(folder, db_path=self.current_db_path)
-        self.worker.finished.connect(self.indexing_finished)
-        self.worker.progress.connect(self.update_progress_bar)
-        self.worker.status_update.connect(self.update_status_label)
-        self.worker.start()
+        self.worker.signals.finished.connect(self.indexing_finished)
+        self.worker.signals.progress.connect(self.update_progress_bar)
+        self.worker.signals.status_update.connect(self.update_status_label)
+        QThreadPool.globalInstance().start(self.worker)
     
     def start_bpm_reanalysis(self):
         force = self.force_reanalysis_checkbox.isChecked()
@@ -1502,13 +1831,21 @@ class MainWindow(QMainWindow):
         self.last_progress_value = 0
         self.last_progress_message = ""
 
-        self.bpm_worker = BPMReanalysisWorker(force_reanalysis=force, db_path=self.current_db_path)
-        self.bpm_worker.finished.connect(self.bpm_reanalysis_finished)
-        self.bpm_worker.progress.connect(self.update_progress_bar)
-        self.bpm_worker.status_update.connect(self.update_status_label)
-        self.bpm_worker.start()
+        # Reuse the searcher's collection only if it belongs to the database shown
+        # (it may not while a switch is loading); otherwise the worker opens db_path
+        collection = None
+        if (self.engine is not None and
+                os.path.normpath(self.engine.db_path) == os.path.normpath(self.current_db_path)):
+            collection = self.engine.collection
+        self.bpm_worker = BPMReanalysisWorker(force_reanalysis=force, db_path=self.current_db_path,
+                                              collection=collection)
+        self.bpm_worker.signals.finished.connect(self.bpm_reanalysis_finished)
+        self.bpm_worker.signals.progress.connect(self.update_progress_bar)
+        self.bpm_worker.signals.status_update.connect(self.update_status_label)
+        QThreadPool.globalInstance().start(self.bpm_worker)
     
-    def bpm_reanalysis_finished(self, count):
+    def end_background_task(self):
+        """Common teardown when indexing/analysis finishes or fails"""
         self.progress_bar.hide()
         # Reset progress timing
         self.progress_start_time = None
@@ -1520,6 +1857,9 @@ class MainWindow(QMainWindow):
         self.btn_essentia_wsl.setEnabled(True)
         self.force_reanalysis_checkbox.setEnabled(True)
         # search_bar and db_selector were never disabled, so no need to re-enable
+
+    def bpm_reanalysis_finished(self, count):
+        self.end_background_task()
         
         if count > 0:
             QMessageBox.information(self, "Done", f"Analysis complete!\nUpdated {count} samples with BPM and Key data.")
@@ -1557,19 +1897,13 @@ class MainWindow(QMainWindow):
         self.status_label.setText("⚙️ Essentia analysis running in background via WSL...")
         
         self.essentia_worker = EssentiaWSLWorker(db_path=self.current_db_path, force_reanalysis=force)
-        self.essentia_worker.finished.connect(self.essentia_wsl_finished)
-        self.essentia_worker.status_update.connect(self.update_status_label)
-        self.essentia_worker.error.connect(self.essentia_wsl_error)
-        self.essentia_worker.start()
+        self.essentia_worker.signals.finished.connect(self.essentia_wsl_finished)
+        self.essentia_worker.signals.status_update.connect(self.update_status_label)
+        self.essentia_worker.signals.error.connect(self.essentia_wsl_error)
+        QThreadPool.globalInstance().start(self.essentia_worker)
     
     def essentia_wsl_finished(self, message):
-        self.progress_bar.hide()
-        
-        self.btn_index.setEnabled(True)
-        self.btn_reanalyze.setEnabled(True)
-        self.btn_essentia_wsl.setEnabled(True)
-        self.force_reanalysis_checkbox.setEnabled(True)
-        # search_bar and db_selector were never disabled, so no need to re-enable
+        self.end_background_task()
         
         QMessageBox.information(self, "Success", message)
         self.status_label.setText(f"✓ {message}")
@@ -1579,29 +1913,35 @@ class MainWindow(QMainWindow):
             self.do_search()
     
     def essentia_wsl_error(self, error_msg):
-        self.progress_bar.hide()
-        
-        self.btn_index.setEnabled(True)
-        self.btn_reanalyze.setEnabled(True)
-        self.btn_essentia_wsl.setEnabled(True)
-        self.force_reanalysis_checkbox.setEnabled(True)
-        # search_bar and db_selector were never disabled, so no need to re-enable
+        self.end_background_task()
         
         QMessageBox.critical(self, "Error", f"Essentia WSL analysis failed:\n\n{error_msg}")
         self.status_label.setText(f"❌ Error: {error_msg}")
 
     def update_progress_bar(self, val):
+        now = time.time()
         # Initialize timing on first progress update
         if self.progress_start_time is None:
-            self.progress_start_time = time.time()
+            self.progress_start_time = now
             self.last_progress_value = 0
+            self.progress_samples = deque()  # (time, value) within PROGRESS_RATE_WINDOW
         
         self.progress_bar.setValue(val)
+        self.progress_samples.append((now, val))
+        while now - self.progress_samples[0][0] > PROGRESS_RATE_WINDOW:
+            self.progress_samples.popleft()
         
         # Calculate estimated time remaining
         if val > 0:
-            elapsed = time.time() - self.progress_start_time
-            progress_rate = val / elapsed  # percentage per second
+            # Rate over the recent window, so a fast or slow start doesn't skew
+            # the whole run; falls back to the overall rate until the window
+            # holds some progress
+            window_start, window_val = self.progress_samples[0]
+            if now > window_start and val > window_val:
+                progress_rate = (val - window_val) / (now - window_start)  # percentage per second
+            else:
+                elapsed = now - self.progress_start_time
+                progress_rate = val / elapsed if elapsed > 0 else 0
             remaining_progress = 100 - val
             
             if progress_rate > 0 and val > self.last_progress_value:
@@ -1638,21 +1978,11 @@ class MainWindow(QMainWindow):
             self.status_label.setText(self.last_progress_message)
 
     def indexing_finished(self, count):
-        self.progress_bar.hide()
-        # Reset progress timing
-        self.progress_start_time = None
-        self.last_progress_value = 0
-        self.last_progress_message = ""
-        
-        self.btn_index.setEnabled(True)
-        self.btn_reanalyze.setEnabled(True)
-        self.btn_essentia_wsl.setEnabled(True)
-        self.force_reanalysis_checkbox.setEnabled(True)
-        # search_bar and db_selector were never disabled, so no need to re-enable
+        self.end_background_task()
         
         self.status_label.setText("Reloading Engine...")
         try: 
-            self.engine = SampleSearcher(db_path=self.current_db_path)
+            self.engine = load_searcher(self.current_db_path)
             self.search_bar.setPlaceholderText("Describe Sound: ")
             self.search_bar.setEnabled(True)
             self.search_bar.setFocus()
@@ -1666,33 +1996,17 @@ class MainWindow(QMainWindow):
 
     def play_preview(self, item):
         file_path = item.data(Qt.ItemDataRole.UserRole)
+        if file_path is None:
+            return  # The "no results" placeholder row
         if file_path.startswith("/mnt/"):
             file_path = self.result_list.wsl_to_windows_path(file_path)
 
-        # Get filename and BPM from the custom widget
-        widget = self.result_list.itemWidget(item)
-        if widget:
-            # Get filename from the top label
-            top_layout = widget.layout().itemAt(0)
-            if top_layout and hasattr(top_layout, 'layout'):
-                filename_label = top_layout.layout().itemAt(0).widget()
-                if filename_label:
-                    self.current_playing_filename = filename_label.text()
-                # Try to get BPM label
-                if top_layout.layout().count() > 1:
-                    bpm_label = top_layout.layout().itemAt(1).widget()
-                    if bpm_label and isinstance(bpm_label, QLabel):
-                        bpm_text = bpm_label.text()
-                        self.playing_label.setText(f"▶ {self.current_playing_filename} | {bpm_text}")
-                    else:
-                        self.playing_label.setText(f"▶ {self.current_playing_filename}")
-                else:
-                    self.playing_label.setText(f"▶ {self.current_playing_filename}")
-            else:
-                self.current_playing_filename = os.path.basename(file_path)
-                self.playing_label.setText(f"▶ {self.current_playing_filename}")
+        # Filename and BPM were stored on the row by show_search_results
+        self.current_playing_filename = item.data(FILENAME_ROLE) or os.path.basename(file_path)
+        bpm = item.data(BPM_ROLE)
+        if bpm and bpm > 0:
+            self.playing_label.setText(f"▶ {self.current_playing_filename} | ♪ {bpm:.0f} BPM")
         else:
-            self.current_playing_filename = os.path.basename(file_path)
             self.playing_label.setText(f"▶ {self.current_playing_filename}")
         
         self.player.setSource(QUrl.fromLocalFile(file_path))
@@ -1714,7 +2028,9 @@ class MainWindow(QMainWindow):
         """Stop playback completely"""
         self.player.stop()
         self.playback_slider.setValue(0)
+        self.shown_slider_value = 0
         self.time_label.setText("0:00")
+        self.shown_position_sec = 0
         self.playing_label.setText("No sample playing")
         self.play_pause_btn.setEnabled(False)
         self.stop_btn.setEnabled(False)
@@ -1722,10 +2038,18 @@ class MainWindow(QMainWindow):
     
     def update_playback_position(self, position):
         """Update playback progress bar and time"""
-        if not self.slider_is_pressed and self.player.duration() > 0:
-            progress = int((position / self.player.duration()) * 1000)
-            self.playback_slider.setValue(progress)
-        self.time_label.setText(self.format_time(position))
+        duration = self.player.duration()
+        if not self.slider_is_pressed and duration > 0:
+            progress = int((position / duration) * 1000)
+            # Tracked here so an unchanged position costs no call into Qt
+            if progress != self.shown_slider_value:
+                self.shown_slider_value = progress
+                self.playback_slider.setValue(progress)
+        # The position is polled ~30 times a second but the label shows whole seconds
+        position_sec = position // 1000
+        if position_sec != self.shown_position_sec:
+            self.shown_position_sec = position_sec
+            self.time_label.setText(self.format_time(position))
     
     def on_slider_pressed(self):
         """Called when user starts dragging the slider"""
@@ -1737,138 +2061,103 @@ class MainWindow(QMainWindow):
         if self.player.duration() > 0:
             new_position = int((self.playback_slider.value() / 1000) * self.player.duration())
             self.player.setPosition(new_position)
+            # The position timer only runs while playing: refresh the label and
+            # shown_slider_value now so a seek while paused/stopped isn't stale
+            self.poll_playback_position()
     
     def update_playback_duration(self, duration):
         """Update total duration display"""
         self.duration_label.setText(self.format_time(duration))
     
     def change_volume(self, value):
-        """Change audio output volume"""
+        """Volume slider moved: schedule apply_volume if it isn't pending yet"""
+        if not self.volume_timer.isActive():
+            self.volume_timer.start()
+
+    def apply_volume(self):
+        """Change audio output volume to the slider's current value"""
+        value = self.volume_slider.value()
         self.audio_ouput.setVolume(value / 100)
         self.volume_label_pct.setText(f"{value}%")
     
+    def poll_playback_position(self):
+        """Timer slot: push the player's current position to the slider and time label"""
+        self.update_playback_position(self.player.position())
+
     def handle_playback_state_changed(self, state):
         """Handle playback state changes"""
+        if state == QMediaPlayer.PlaybackState.PlayingState:
+            self.position_timer.start()
+        else:
+            self.position_timer.stop()
+            if state == QMediaPlayer.PlaybackState.PausedState:
+                self.poll_playback_position()  # Show the exact paused position
         if state == QMediaPlayer.PlaybackState.StoppedState:
             self.playback_slider.setValue(0)
+            self.shown_slider_value = 0
             if self.current_playing_filename:
                 self.playing_label.setText(f"■ {self.current_playing_filename}")
     
     def format_time(self, ms):
         """Convert milliseconds to MM:SS format"""
-        seconds = ms // 1000
-        minutes = seconds // 60
-        seconds = seconds % 60
+        minutes, seconds = divmod(ms // 1000, 60)
         return f"{minutes}:{seconds:02d}"
 
-    def apply_filters(self, results):
-        """Apply user-defined filters to search results"""
-        filtered = []
+    def filter_settings(self):
+        """Snapshot the filter widgets for filter_results() (None: no filter is active)"""
+        if not self.filters_built:
+            # Filter panel never opened: every filter is at its default
+            return None
         
         # Get filter values
-        include_pattern = self.include_pattern.text().strip()
-        exclude_pattern = self.exclude_pattern.text().strip()
-        min_dur = self.min_duration.value()
-        max_dur = self.max_duration.value()
-        format_filter = self.format_combo.currentText()
-        min_sim = self.min_similarity.value()
-        max_sim = self.max_similarity.value()
-        
-        for item in results:
-            filename = item['filename']
-            full_path = item['route']
-            distance = item['score']
-            metadata = item.get('metadata', {})
-            similarity_percent = max(0, min(100, (1 - distance / 2) * 100))
-            
-            # Build item with metadata for later use
-            item_with_meta = {
-                'filename': filename,
-                'route': full_path,
-                'score': distance,
-                'metadata': metadata
-            }
-            
-            # Filter by similarity
-            if similarity_percent < min_sim or similarity_percent > max_sim:
-                continue
-            
-            # Filter by include pattern
-            if include_pattern:
-                try:
-                    if not re.search(include_pattern, filename, re.IGNORECASE):
-                        continue
-                except re.error:
-                    pass  # Invalid regex, skip pattern
-            
-            # Filter by exclude pattern
-            if exclude_pattern:
-                try:
-                    if re.search(exclude_pattern, filename, re.IGNORECASE):
-                        continue
-                except re.error:
-                    pass  # Invalid regex, skip pattern
-            
-            # Filter by format
-            if format_filter != "All":
-                file_ext = os.path.splitext(filename)[1].lower().strip('.')
-                if file_ext != format_filter:
-                    continue
-            
-            # Filter by BPM
-            min_bpm_val = self.min_bpm.value()
-            max_bpm_val = self.max_bpm.value()
-            if min_bpm_val > 0 or max_bpm_val < 300:
-                bpm = item.get('metadata', {}).get('bpm', 0)
-                if bpm is None:
-                    bpm = 0
-                if bpm > 0:  # Only filter samples that have BPM detected
-                    if bpm < min_bpm_val or bpm > max_bpm_val:
-                        continue
-            
-            # Filter by Key
-            key_filter = self.key_filter.currentText()
-            if key_filter != "All":
-                sample_key = item.get('metadata', {}).get('key', '')
-                if sample_key != key_filter:
-                    continue
-            
-            # Filter by duration (if file exists and we can check)
-            if min_dur > 0 or max_dur < 999:
-                try:
-                    # Convert WSL path to Windows if needed
-                    check_path = full_path
-                    if check_path.startswith("/mnt/"):
-                        check_path = self.result_list.wsl_to_windows_path(check_path)
-                    
-                    duration = None
-                    ext = os.path.splitext(check_path)[1].lower()
-                    
-                    if ext == '.wav' and os.path.exists(check_path):
-                        try:
-                            with wave.open(check_path, 'rb') as wf:
-                                duration = wf.getnframes() / float(wf.getframerate())
-                        except:
-                            pass
-                    elif ext in ['.mp3', '.aif', '.aiff', '.flac', '.ogg', '.opus', '.m4a', '.aac'] and os.path.exists(check_path):
-                        try:
-                            info = MutagenFile(check_path)
-                            if info is not None and info.info:
-                                duration = info.info.length
-                        except:
-                            pass
-                    
-                    if duration is not None:
-                        if duration < min_dur or duration > max_dur:
-                            continue
-                except:
-                    pass  # If we can't check duration, include the file
-            
-            filtered.append((item_with_meta, similarity_percent))
-        
-        return filtered
+        settings = {
+            'include_re': compile_filter_pattern(self.include_pattern.text().strip()),
+            'exclude_re': compile_filter_pattern(self.exclude_pattern.text().strip()),
+            'min_dur': self.min_duration.value(),
+            'max_dur': self.max_duration.value(),
+            'format_filter': self.format_combo.currentText(),
+            'min_sim': self.min_similarity.value(),
+            'max_sim': self.max_similarity.value(),
+            'min_bpm_val': self.min_bpm.value(),
+            'max_bpm_val': self.max_bpm.value(),
+            'key_filter': self.key_filter.currentText(),
+        }
+        
+        # Which filters differ from their reset_filters() defaults
+        settings['sim_active'] = settings['min_sim'] > 0 or settings['max_sim'] < 100
+        settings['format_active'] = settings['format_filter'] != "All"
+        settings['bpm_active'] = settings['min_bpm_val'] > 0 or settings['max_bpm_val'] < 300
+        settings['key_active'] = settings['key_filter'] != "All"
+        settings['duration_active'] = settings['min_dur'] > 0 or settings['max_dur'] < 999
+        if not (settings['include_re'] or settings['exclude_re'] or settings['sim_active']
+                or settings['format_active'] or settings['bpm_active'] or settings['key_active']
+                or settings['duration_active']):
+            return None
+        
+        # BPM and key are stored metadata, so ChromaDB can apply them in the
+        # query itself and fetch_k isn't spent on rows filter_results would drop
+        conditions = []
+        if settings['bpm_active']:
+            # Samples without a detected BPM (0) are never filtered out by BPM
+            conditions.append({"$or": [{"bpm": {"$lte": 0}},
+                                       {"$and": [{"bpm": {"$gte": settings['min_bpm_val']}},
+                                                 {"bpm": {"$lte": settings['max_bpm_val']}}]}]})
+        if settings['key_active']:
+            conditions.append({"key": settings['key_filter']})
+        if len(conditions) > 1:
+            settings['where'] = {"$and": conditions}
+        else:
+            settings['where'] = conditions[0] if conditions else None
+        return settings
     
+    def schedule_search(self, *_):
+        """Rerun the search once filter edits go quiet (see SEARCH_DEBOUNCE_MS)"""
+        # Not connected to search_timer.start directly: signals carrying an int
+        # (currentIndexChanged) would pick the start(msec) overload
+        self.search_timer.start()
+
     def do_search(self):
+        self.search_timer.stop()  # Searching now covers any pending filter change
         if self.engine is None:
             return
         query = self.search_bar.text().strip()
@@ -1877,17 +2166,18 @@ class MainWindow(QMainWindow):
         if not query:
             return
         
-        # Get more results than requested to account for filtering
-        top_k = self.results_spinbox.value()
-        fetch_k = min(100, top_k * 3)  # Fetch 3x to ensure enough after filtering
-        
-        results = self.engine.search(query, top_k=fetch_k)
-        
-        # Apply filters
-        filtered_results = self.apply_filters(results)
-        
-        # Limit to requested count
-        filtered_results = filtered_results[:top_k]
+        # The model forward pass, DB query and filtering run on search_pool;
+        # a search still queued behind the running one is superseded by this one
+        self.search_id += 1
+        self.search_pool.clear()
+        self.search_worker = SearchWorker(self.search_id, self.engine, query,
+                                          self.results_spinbox.value(), self.filter_settings())
+        self.search_worker.signals.results_ready.connect(self.show_search_results)
+        self.search_pool.start(self.search_worker)
+    
+    def show_search_results(self, search_id, filtered_results):
+        if search_id != self.search_id:
+            return  # A newer search (or database) replaced this one
         
         self.result_list.clear()
         
@@ -1898,24 +2188,32 @@ class MainWindow(QMainWindow):
             self.result_list.addItem(empty_item)
             return
 
-        for item, similarity_percent in filtered_results:
-            filename = item['filename']
-            full_path = item['route']
-            bpm = item.get('metadata', {}).get('bpm', None)
-            key = item.get('metadata', {}).get('key', None)
-            analysis_engine = item.get('metadata', {}).get('analysis_engine', None)
-            
-            # Create custom widget with BPM, Key, and analysis engine
-            widget = ResultWidget(filename, similarity_percent, bpm, key, analysis_engine)
-            
-            # Create list item
-            list_item = QListWidgetItem(self.result_list)
-            list_item.setData(Qt.ItemDataRole.UserRole, full_path)
-            list_item.setSizeHint(widget.sizeHint())
-            
-            # Add to list
-            self.result_list.addItem(list_item)
-            self.result_list.setItemWidget(list_item, widget)
+        # Build all rows with painting off, so the list lays out and repaints
+        # once instead of after every row
+        self.result_list.setUpdatesEnabled(False)
+        try:
+            for item, similarity_percent in filtered_results:
+                filename = item['filename']
+                full_path = item['route']
+                bpm = item.get('metadata', {}).get('bpm', None)
+                key = item.get('metadata', {}).get('key', None)
+                analysis_engine = item.get('metadata', {}).get('analysis_engine', None)
+                
+                # Create custom widget with BPM, Key, and analysis engine
+                widget = ResultWidget(filename, similarity_percent, bpm, key, analysis_engine)
+                
+                # Create list item (passing the list as parent already appends it)
+                list_item = QListWidgetItem(self.result_list)
+                list_item.setData(Qt.ItemDataRole.UserRole, full_path)
+                list_item.setData(FILENAME_ROLE, filename)
+                list_item.setData(BPM_ROLE, bpm)
+                list_item.setSizeHint(widget.sizeHint())
+                self.result_list.setItemWidget(list_item, widget)
+        finally:
+            self.result_list.setUpdatesEnabled(True)
+        
+        QThreadPool.globalInstance().start(PreviewPrefetchWorker(
+            [wsl_to_windows_path(item['route']) for item, _ in filtered_results[:PREVIEW_PREFETCH_COUNT]]))
 
 # Dark Theme
 STYLESHEET = """
@@ -2006,6 +2304,7 @@ QGroupBox {
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     app.setStyleSheet(STYLESHEET)
+    app.setWindowIcon(app_icon())  # Default for dialogs/message boxes too
     window = MainWindow()
     window.show()
     sys.exit(app.exec())
\ No newline at end of file
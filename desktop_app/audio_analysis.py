@@ -0,0 +1,268 @@
+# BPM/Key analysis, content hashing and header-only duration probing.
+# Kept free of torch/transformers/chromadb: the reanalysis process pool targets
+# this module, and on Windows every worker process imports it from scratch.
+import os
+# Suppress ffmpeg/libav warnings (e.g., vorbis timestamp warnings)
+os.environ["AV_LOG_LEVEL"] = "error"
+os.environ["AUDIOREAD_BACKENDS"] = "ffmpeg"  # Ensure audioread uses ffmpeg
+import sys
+import contextlib
+import threading
+import hashlib
+import mmap
+import struct
+import warnings
+import librosa
+import numpy as np
+from mutagen import File as MutagenFile
+
+# Suppress librosa warnings for short samples
+warnings.filterwarnings('ignore', category=UserWarning, module='librosa')
+warnings.filterwarnings('ignore')
+
+# Redirect stderr to suppress ffmpeg warnings that slip through
+_stderr_lock = threading.Lock()
+_stderr_depth = 0
+_saved_stderr = None
+
+@contextlib.contextmanager
+def suppress_stderr():
+    """Context manager to suppress stderr output.
+
+    sys.stderr is process-wide, so nested/concurrent uses (indexing decodes on
+    several threads) share one redirect that is undone when the last one exits.
+    """
+    global _stderr_depth, _saved_stderr
+    with _stderr_lock:
+        if _stderr_depth == 0:
+            _saved_stderr = sys.stderr
+            sys.stderr = open(os.devnull, 'w')
+        _stderr_depth += 1
+    try:
+        yield
+    finally:
+        with _stderr_lock:
+            _stderr_depth -= 1
+            if _stderr_depth == 0:
+                sys.stderr.close()
+                sys.stderr = _saved_stderr
+
+# Sample rates for BPM/Key analysis: during indexing, and for BPM/Key-only
+# reanalysis (see analyze_bpm_and_key)
+ANALYSIS_SR = 22050
+FAST_ANALYSIS_SR = 11025
+
+# Shortest audio worth running BPM/Key analysis on (seconds)
+MIN_ANALYSIS_SECONDS = 0.5
+
+def wav_quick_duration(file_path):
+    """Duration of a WAV file in seconds from its RIFF headers alone, or None.
+
+    Walks the chunk headers of a memory-mapped view of the file, so only the
+    pages holding 'fmt ' and the 'data' header are actually read.
+    """
+    try:
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            riff, _, wave_id = struct.unpack_from('<4sI4s', mm, 0)
+            if riff != b'RIFF' or wave_id != b'WAVE':
+                return None
+            offset = 12
+            byte_rate = None
+            while offset + 8 <= len(mm):
+                chunk_id, chunk_size = struct.unpack_from('<4sI', mm, offset)
+                if chunk_id == b'fmt ':
+                    byte_rate = struct.unpack_from('<I', mm, offset + 16)[0]
+                elif chunk_id == b'data':
+                    if not byte_rate:
+                        return None
+                    # Clamp to the file size for truncated/streamed files
+                    data_size = min(chunk_size, len(mm) - offset - 8)
+                    return data_size / byte_rate
+                offset += 8 + chunk_size + (chunk_size & 1)  # Chunks are word aligned
+    except (OSError, ValueError, struct.error):
+        pass
+    return None
+
+# Extensions whose duration comes from the mutagen tag parser (WAV uses wav_quick_duration)
+MUTAGEN_DURATION_EXTENSIONS = frozenset({'.mp3', '.aif', '.aiff', '.flac', '.ogg', '.opus', '.m4a', '.aac'})
+
+def probe_duration(file_path):
+    """Duration in seconds from the file's header alone, or None if unknown/unreadable"""
+    ext = os.path.splitext(file_path)[1].lower()
+    try:
+        if ext == '.wav':
+            return wav_quick_duration(file_path)
+        elif ext in MUTAGEN_DURATION_EXTENSIONS:
+            info = MutagenFile(file_path)
+            if info is not None and info.info:
+                return info.info.length
+    except Exception:
+        return None
+    return None
+
+# Bytes read to fingerprint a file's content (see content_hash)
+CONTENT_HASH_BYTES = 1 << 20
+
+def content_hash(file_path):
+    """Cheap content fingerprint: blake2b over the file size and its first MiB"""
+    with open(file_path, 'rb') as f:
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(os.fstat(f.fileno()).st_size.to_bytes(8, 'little'))
+        digest.update(f.read(CONTENT_HASH_BYTES))
+    return digest.hexdigest()
+
+def reanalyze_bpm_and_key(file_path, known_hash=None):
+    """Fast BPM/Key analysis for reanalysis runs, skipped for unchanged files.
+
+    Returns (hash, result). result is None when the file still matches
+    known_hash (it was already analyzed in this state), else (bpm, key).
+    hash is None if the file can't be read.
+    """
+    try:
+        file_hash = content_hash(file_path)
+    except OSError:
+        file_hash = None
+    if known_hash is not None and file_hash == known_hash:
+        return file_hash, None
+    return file_hash, analyze_bpm_and_key(file_path, fast=True)
+
+# Split harmonic/percussive parts before BPM/Key analysis. Off by default: HPSS
+# (STFT, two median filters, two inverse STFTs) costs about as much as the
+# rest of the analysis for little difference on short samples
+ANALYSIS_HPSS = False
+
+PITCH_CLASSES = ('C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B')
+
+# Krumhansl-Schmuckler key profiles, normalized once at import
+MAJOR_PROFILE = np.array([6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88])
+MINOR_PROFILE = np.array([6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17])
+MAJOR_PROFILE /= np.linalg.norm(MAJOR_PROFILE)
+MINOR_PROFILE /= np.linalg.norm(MINOR_PROFILE)
+
+# Row 2*i is the major profile rolled to pitch class i, row 2*i+1 the minor one,
+# so KEY_TEMPLATES @ chroma gives every key's correlation in one product (ties
+# resolve in the same C maj, C min, C# maj, ... order as a per-key loop)
+KEY_TEMPLATES = np.stack([np.roll(profile, i) for i in range(12)
+                          for profile in (MAJOR_PROFILE, MINOR_PROFILE)])
+
+def analyze_bpm_and_key(file_path, fast=False):
+    """Extract BPM and Key using librosa.
+
+    Module-level (no model or DB state) so it can run in a process pool.
+    With fast=True audio is loaded at FAST_ANALYSIS_SR with a low-quality
+    resampler: roughly half the STFT/CQT work, at the cost of coarser tempo
+    resolution (fewer onset frames per second) and no content above ~5.5 kHz,
+    which neither the onset envelope nor the chroma needs.
+    """
+    try:
+        # Load audio once (first 30 seconds is enough for analysis)
+        with suppress_stderr():
+            if fast:
+                y, sr = librosa.load(file_path, sr=FAST_ANALYSIS_SR, mono=True,
+                                     duration=30.0, res_type='soxr_lq')
+            else:
+                y, sr = librosa.load(file_path, sr=ANALYSIS_SR, duration=30.0)
+    except Exception:
+        return None, None
+    return analyze_audio_bpm_and_key(y, sr)
+
+# Onset envelope hop, and the tempo range searched by autocorrelation_tempo
+TEMPO_HOP_LENGTH = 512
+MIN_TEMPO_BPM = 40
+MAX_TEMPO_BPM = 200
+
+def autocorrelation_tempo(onset_env, sr, hop_length=TEMPO_HOP_LENGTH):
+    """Tempo (BPM) at the strongest onset-envelope autocorrelation lag, or None.
+
+    A single global autocorrelation restricted to MIN_TEMPO_BPM..MAX_TEMPO_BPM:
+    much cheaper than librosa.beat.tempo's frame-wise tempogram, and the octave
+    folding in analyze_audio_bpm_and_key replaces its prior around 120 BPM.
+    """
+    min_lag = int(60.0 * sr / (hop_length * MAX_TEMPO_BPM))
+    max_lag = int(np.ceil(60.0 * sr / (hop_length * MIN_TEMPO_BPM)))
+    # Remove the DC offset, otherwise the autocorrelation just decays with lag
+    ac = librosa.autocorrelate(onset_env - onset_env.mean(), max_size=max_lag + 2)
+    if len(ac) <= min_lag + 1:
+        return None  # Too short to hold even one beat period
+    lag = min_lag + int(np.argmax(ac[min_lag:max_lag + 1]))
+    if ac[lag] <= 0:
+        return None
+    # Parabolic interpolation around the peak for sub-frame lag precision
+    if lag + 1 < len(ac):
+        prev, peak, nxt = ac[lag - 1], ac[lag], ac[lag + 1]
+        curvature = prev - 2 * peak + nxt
+        if curvature < 0:
+            lag = lag + 0.5 * (prev - nxt) / curvature
+    return 60.0 * sr / (hop_length * lag)
+
+def analyze_audio_bpm_and_key(y, sr):
+    """BPM and Key of an already decoded mono signal (see analyze_bpm_and_key)"""
+    try:
+        # Skip very short samples
+        if len(y) < sr * MIN_ANALYSIS_SECONDS:
+            return None, None
+        
+        if ANALYSIS_HPSS:
+            # Separate harmonic (for Key) and percussive (for BPM)
+            y_harmonic, y_percussive = librosa.effects.hpss(y)
+        else:
+            # The onset envelope copes with the full mix, and the chroma already
+            # spreads broadband (percussive) energy evenly across pitch classes
+            y_harmonic = y_percussive = y
+        
+        # === BPM Detection ===
+        bpm = None
+        try:
+            # onset_strength is generally more reliable for "feeling" the beat
+            onset_env = librosa.onset.onset_strength(y=y_percussive, sr=sr, hop_length=TEMPO_HOP_LENGTH)
+            
+            # estimate tempo
+            base_bpm = autocorrelation_tempo(onset_env, sr)
+            if base_bpm is not None:  # None: no periodicity (e.g. silence or a one-shot)
+                # Heuristic: Prioritize 80-160 BPM range (standard dance/pop range)
+                # If detected BPM is < 80, try doubling it. If > 160, try halving it.
+                candidates = [base_bpm]
+                if base_bpm < 80:
+                    candidates.append(base_bpm * 2)
+                if base_bpm > 160:
+                    candidates.append(base_bpm / 2)
+            
+                # Filter candidates within strictly reasonable bounds
+                valid_candidates = [b for b in candidates if 40 <= b <= 200]
+            
+                # Pick the one closest to the 100-130 "sweet spot" if multiple exist
+                if valid_candidates:
+                    # Sort by distance to 120 BPM
+                    final_bpm = min(valid_candidates, key=lambda x: abs(x - 120))
+                    bpm = round(final_bpm, 1)
+        except Exception as e:
+            print(f"Librosa BPM Error: {e}")
+            pass
+        
+        # === Key Detection ===
+        key = None
+        try:
+            # Only the clip-wide mean chroma is used, which a single STFT gives
+            # almost identically to the (much slower) constant-Q transform
+            chroma = librosa.feature.chroma_stft(y=y_harmonic, sr=sr, n_fft=2048, hop_length=1024)
+            chroma_mean = np.mean(chroma, axis=1)
+            
+            if np.std(chroma_mean) >= 1e-6:
+                # Normalize chroma
+                chroma_mean /= (np.linalg.norm(chroma_mean) + 1e-8)
+                
+                # Correlation with all 24 keys at once
+                correlations = KEY_TEMPLATES @ chroma_mean
+                best = int(np.argmax(correlations))
+                
+                # Confidence threshold (arbitrary, but 0.5 is usually safe)
+                if correlations[best] > 0.5:
+                    key = f"{PITCH_CLASSES[best // 2]} {'Maj' if best % 2 == 0 else 'Min'}"
+        except Exception as e:
+            print(f"Librosa Key Error: {e}")
+            pass
+        
+        return bpm, key
+        
+    except Exception:
+        return None, None
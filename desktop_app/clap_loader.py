@@ -0,0 +1,57 @@
+import os
+import threading
+
+from transformers import ClapModel, ClapProcessor
+
+# Default model name from HuggingFace
+# MODEL_NAME = "laion/clap-htsat-unfused"
+MODEL_NAME = "laion/larger_clap_music_and_speech"
+
+# Use local model cache to avoid downloading from HuggingFace
+LOCAL_MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'cloud_api', 'model_cache', MODEL_NAME.replace('/', '_'))
+
+# (model_name, device) -> (model, processor), shared by the indexer and the searcher
+_clap_cache = {}
+_clap_lock = threading.Lock()
+
+
+def load_clap(model_name=None, device="cpu"):
+    """Return the (model, processor) pair for model_name on device, loading it only once.
+
+    With model_name=None the local model cache is used if present, otherwise
+    MODEL_NAME is downloaded into it. The indexer and searcher may be created
+    on different threads, so loading is serialized: the second caller waits
+    and gets the same instance instead of a second copy in (V)RAM.
+    """
+    with _clap_lock:
+        cached = _clap_cache.get((model_name, device))
+        if cached is not None:
+            return cached
+
+        # Use local model if available, otherwise fallback to HuggingFace
+        use_local = False
+        name = model_name
+        if name is None:
+            # Check if local model exists AND has required files
+            if os.path.exists(LOCAL_MODEL_PATH) and os.path.exists(os.path.join(LOCAL_MODEL_PATH, 'config.json')):
+                name = LOCAL_MODEL_PATH
+                use_local = True
+                print(f"Using local model cache: {name}")
+            else:
+                name = MODEL_NAME
+                print(f"Using HuggingFace model: {name}")
+
+        print(f"Loading CLAP model on: {device}")
+        if use_local:
+            model = ClapModel.from_pretrained(name, use_safetensors=True, local_files_only=True).to(device)
+            processor = ClapProcessor.from_pretrained(name, local_files_only=True)
+        else:
+            # Download to custom cache directory
+            cache_base = os.path.join(os.path.dirname(__file__), '..', 'cloud_api', 'model_cache')
+            os.makedirs(cache_base, exist_ok=True)
+            print(f"Downloading model to: {LOCAL_MODEL_PATH}")
+            model = ClapModel.from_pretrained(name, use_safetensors=True, cache_dir=LOCAL_MODEL_PATH).to(device)
+            processor = ClapProcessor.from_pretrained(name, cache_dir=LOCAL_MODEL_PATH)
+
+        cached = _clap_cache[(model_name, device)] = (model, processor)
+        return cached
@@ -1,16 +1,17 @@
 import os
-# Suppress ffmpeg/libav warnings (e.g., vorbis timestamp warnings)
-os.environ["AV_LOG_LEVEL"] = "error"
-os.environ["AUDIOREAD_BACKENDS"] = "ffmpeg"  # Ensure audioread uses ffmpeg
-import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+# Analysis helpers live in a torch-free module (see audio_analysis.py); importing
+# it first also applies its ffmpeg/warning suppression before librosa loads
+from audio_analysis import (suppress_stderr, ANALYSIS_SR, MUTAGEN_DURATION_EXTENSIONS, probe_duration,
+                            analyze_bpm_and_key, analyze_audio_bpm_and_key)
 import chromadb
 import librosa
 import torch
 import numpy as np
-import wave
-import warnings
-from mutagen import File as MutagenFile
-from transformers import ClapModel, ClapProcessor
+from clap_loader import load_clap
+from threadpoolctl import threadpool_limits
 from tqdm import tqdm
 
 # Windows desktop app uses librosa only
@@ -18,240 +19,308 @@ from tqdm import tqdm
 print("Using librosa for BPM and Key detection")
 print("  Use 'Analyze with Essentia (WSL)' button for more accurate essentia analysis")
 
-# Suppress librosa warnings for short samples
-warnings.filterwarnings('ignore', category=UserWarning, module='librosa')
-warnings.filterwarnings('ignore')
+# Default database path
+DB_PATH = "./sample_db"
+
+# BPM/Key engine used by this module (Essentia runs separately via WSL)
+AUDIO_ENGINE = "Librosa"
+MAX_DURATION = 10.0
+# Shorter files are empty/truncated fragments rather than samples and are
+# skipped before decoding (kept well below the shortest real one-shots)
+MIN_DURATION = 0.02
+
+# Page size for reading metadata out of ChromaDB
+FETCH_PAGE_SIZE = 10000
+
+# Sample rate expected by the CLAP audio encoder
+EMBEDDING_SR = 48000
+
+# Decode/analysis threads during indexing, and how many files they may run
+# ahead of the (main-thread) embedding model
+INDEXING_WORKERS = os.cpu_count() or 4
+INDEXING_PREFETCH = INDEXING_WORKERS * 2
 
-# Redirect stderr to suppress ffmpeg warnings that slip through
-import contextlib
+# Decoded files per CLAP forward pass during indexing
+EMBEDDING_BATCH_SIZE = 16
+# Embedded samples per collection.add() call (one DB transaction) during indexing
+DB_WRITE_BATCH_SIZE = 256
 
-@contextlib.contextmanager
-def suppress_stderr():
-    """Context manager to suppress stderr output"""
-    with open(os.devnull, 'w') as devnull:
-        old_stderr = sys.stderr
-        sys.stderr = devnull
+# Every extension the indexer picks up
+AUDIO_EXTENSIONS = MUTAGEN_DURATION_EXTENSIONS | {'.wav'}
+
+def iter_audio_files(folder_path):
+    """Yield the path of every audio file under folder_path (like os.walk, no symlinked dirs).
+
+    Works straight off os.scandir entries, whose cached type info spares a
+    stat per entry, with one set lookup per file name.
+    """
+    pending_dirs = [folder_path]
+    while pending_dirs:
         try:
-            yield
-        finally:
-            sys.stderr = old_stderr
+            with os.scandir(pending_dirs.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir():
+                            if not entry.is_symlink():
+                                pending_dirs.append(entry.path)
+                        elif os.path.splitext(entry.name)[1].lower() in AUDIO_EXTENSIONS:
+                            yield entry.path
+                    except OSError:
+                        continue
+        except OSError:
+            continue  # Unreadable directory, skipped like os.walk does
 
-# Default database path
-DB_PATH = "./sample_db"
-MAX_DURATION = 10.0
+def load_embedding_audio(file_path):
+    """Decode the first MAX_DURATION seconds of a file at EMBEDDING_SR (None on failure)."""
+    try:
+        with suppress_stderr():
+            audio, _ = librosa.load(file_path, sr=EMBEDDING_SR, duration=MAX_DURATION)
+        return audio
+    except Exception as e:
+        print(f"\nError processing {file_path}: {e}")
+        return None
+
+
+def warm_up_analysis():
+    """Run the indexing analysis path once on a synthetic click track.
+
+    The first call in a process pays for librosa's lazily imported submodules
+    and its Numba JIT compilation; doing it up front keeps that multi-second
+    stall off the first indexed file.
+    """
+    y = np.zeros(2 * EMBEDDING_SR, dtype=np.float32)
+    y[::EMBEDDING_SR // 2] = 1.0  # 120 BPM clicks, so the tempo path runs in full
+    with suppress_stderr():
+        y = librosa.resample(y, orig_sr=EMBEDDING_SR, target_sr=ANALYSIS_SR)
+        analyze_audio_bpm_and_key(y, ANALYSIS_SR)
+
+
+def prepare_file(file_path):
+    """CPU stage of indexing one file: decode for the embedding, then BPM/Key.
+
+    Runs on indexing worker threads; the decoders and numpy release the GIL for
+    most of this. Returns (audio, bpm, key), or (None, None, None) if the file
+    can't be decoded.
+    """
+    audio = load_embedding_audio(file_path)
+    if audio is None:
+        return None, None, None
+    # Indexed files are at most MAX_DURATION long, so the embedding decode
+    # already holds all of the audio: resample it for analysis rather than
+    # decoding the file a second time
+    try:
+        y = librosa.resample(audio, orig_sr=EMBEDDING_SR, target_sr=ANALYSIS_SR)
+    except Exception:
+        return audio, None, None
+    bpm, key = analyze_audio_bpm_and_key(y, ANALYSIS_SR)
+    return audio, bpm, key
+
+
+def open_collection(db_path=DB_PATH):
+    """Open (creating if needed) the samples collection without loading any model"""
+    client = chromadb.PersistentClient(path=db_path)
+    return client.get_or_create_collection(name="samples_library")
+
+
+def iter_sample_metadatas(collection, page_size=FETCH_PAGE_SIZE):
+    """Yield (id, metadata) for every sample in collection, one page at a time.
 
-# Default model name from HuggingFace
-# MODEL_NAME = "laion/clap-htsat-unfused"
-MODEL_NAME = "laion/larger_clap_music_and_speech"
+    Only metadatas are fetched (no embeddings/documents), so memory use is
+    bounded by the page size rather than the library size.
+    """
+    offset = 0
+    while True:
+        page = collection.get(include=['metadatas'], limit=page_size, offset=offset)
+        page_ids = page.get('ids', [])
+        if not page_ids:
+            return
+        yield from zip(page_ids, page.get('metadatas', []))
+        offset += len(page_ids)
 
-# Use local model cache to avoid downloading from HuggingFace
-LOCAL_MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'cloud_api', 'model_cache', MODEL_NAME.replace('/', '_'))
 
 class IndexerBackend:
     def __init__(self, db_path=DB_PATH):
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         print(f"Indexer using device: {self.device}")
+        # Run the encoder under FP16 autocast on GPU (embeddings are stored as FP32)
+        self.use_fp16 = self.device == "cuda"
+        if self.device == "cuda":
+            # Input shapes are fixed (the processor pads every clip), so let cuDNN pick its fastest kernels once
+            torch.backends.cudnn.benchmark = True
         
         # Store which audio analysis engine is being used (always librosa for Windows app)
-        self.audio_engine = "Librosa"
+        self.audio_engine = AUDIO_ENGINE
         
-        # Use local model if available, otherwise fallback to HuggingFace
-        use_local = False
-        if os.path.exists(LOCAL_MODEL_PATH) and os.path.exists(os.path.join(LOCAL_MODEL_PATH, 'config.json')):
-            model_name = LOCAL_MODEL_PATH
-            use_local = True
-            print(f"Using local model cache: {model_name}")
-        else:
-            model_name = MODEL_NAME
-            print(f"Using HuggingFace model: {model_name}")
-        
-        #Load Models
-        if use_local:
-            self.model = ClapModel.from_pretrained(model_name, use_safetensors=True, local_files_only=True).to(self.device)
-            self.processor = ClapProcessor.from_pretrained(model_name, local_files_only=True)
-        else:
-            # Download to custom cache directory
-            cache_base = os.path.join(os.path.dirname(__file__), '..', 'cloud_api', 'model_cache')
-            os.makedirs(cache_base, exist_ok=True)
-            print(f"Downloading model to: {LOCAL_MODEL_PATH}")
-            self.model = ClapModel.from_pretrained(model_name, use_safetensors=True, cache_dir=LOCAL_MODEL_PATH).to(self.device)
-            self.processor = ClapProcessor.from_pretrained(model_name, cache_dir=LOCAL_MODEL_PATH)
+        #Load Models (shared with the searcher if it already loaded them)
+        self.model, self.processor = load_clap(device=self.device)
         #Create and connect DB
-        self.chroma_client = chromadb.PersistentClient(path=db_path)
-        self.collection = self.chroma_client.get_or_create_collection(name="samples_library")
+        self.collection = open_collection(db_path)
+        warm_up_analysis()
     
     def get_audio_engine(self):
         """Returns the name of the audio analysis engine being used"""
         return self.audio_engine
 
+    def iter_sample_metadatas(self, page_size=FETCH_PAGE_SIZE):
+        """Yield (id, metadata) for every sample, one page at a time"""
+        return iter_sample_metadatas(self.collection, page_size)
+
     def get_audio_embedding(self, file_path):
+        audio = load_embedding_audio(file_path)
+        if audio is None:
+            return None
+        return self.embed_audio(audio, file_path)
+
+    def _to_device(self, inputs):
+        """Move processor tensors to the model device (pinned + non-blocking copies on CUDA)"""
+        if self.device == "cuda":
+            return {k: v.pin_memory().to(self.device, non_blocking=True) for k, v in inputs.items()}
+        return {k: v.to(self.device) for k, v in inputs.items()}
+
+    def embed_audio(self, audio, file_path):
+        """Run the CLAP audio encoder on an already decoded EMBEDDING_SR waveform"""
         try:
-            with suppress_stderr():
-                audio, sr = librosa.load(file_path, sr=48000, duration=MAX_DURATION)
-            inputs = self.processor(audio=audio, return_tensors="pt", sampling_rate=sr)
-            inputs = {k: v.to(self.device) for k, v in inputs.items()} #Move tensors from the dict to the GPU
-            with torch.no_grad():
+            inputs = self.processor(audio=audio, return_tensors="pt", sampling_rate=EMBEDDING_SR)
+            inputs = self._to_device(inputs) #Move tensors from the dict to the GPU
+            with torch.inference_mode(), torch.autocast("cuda", dtype=torch.float16, enabled=self.use_fp16):
                 output = self.model.get_audio_features(**inputs)      
                 # Extract the tensor from the output object
                 embedding = output.pooler_output if hasattr(output, 'pooler_output') else output
+            # Store unit vectors: the collection's squared L2 distance is then 2 - 2*cosine,
+            # which the app's similarity % relies on
+            embedding = torch.nn.functional.normalize(embedding.float(), dim=-1)
             return embedding.cpu().numpy().tolist()[0]
         except Exception as e:
             print(f"\nError processing {file_path}: {e}")
             return None
+
+    def embed_audio_batch(self, audios, file_paths):
+        """Run the CLAP audio encoder on several decoded waveforms in one forward pass.
+
+        Returns one embedding (or None) per waveform. If the batch fails, its
+        files are retried one by one so a single bad file doesn't drop the rest.
+        """
+        if len(audios) == 1:
+            return [self.embed_audio(audios[0], file_paths[0])]
+        try:
+            # The processor pads/truncates every clip to the same length
+            inputs = self.processor(audio=audios, return_tensors="pt", sampling_rate=EMBEDDING_SR)
+            inputs = self._to_device(inputs)
+            with torch.inference_mode(), torch.autocast("cuda", dtype=torch.float16, enabled=self.use_fp16):
+                output = self.model.get_audio_features(**inputs)
+                embedding = output.pooler_output if hasattr(output, 'pooler_output') else output
+            embedding = torch.nn.functional.normalize(embedding.float(), dim=-1)
+            return embedding.cpu().numpy().tolist()
+        except Exception as e:
+            print(f"\nBatch embedding failed ({e}), retrying files one by one")
+            return [self.embed_audio(audio, file_path) for audio, file_path in zip(audios, file_paths)]
         
     def get_duration(self, file_path):
-        ext = os.path.splitext(file_path)[1].lower()
-        try:
-            if ext == '.wav':
-                with wave.open(file_path, 'rb') as wf:
-                    return wf.getnframes() / float(wf.getframerate())
-            elif ext in ['.mp3', '.aif', '.aiff', '.flac', '.ogg', '.opus', '.m4a', '.aac']:
-                info = MutagenFile(file_path)
-                if info is not None and info.info:
-                    return info.info.length
-        except Exception:
-            return None
-        return None
+        return probe_duration(file_path)
     
-    def get_bpm_and_key(self, file_path):
+    def get_bpm_and_key(self, file_path, fast=False):
         """Extract BPM and Key using librosa"""
-        try:
-            # Load audio once (first 30 seconds is enough for analysis)
-            with suppress_stderr():
-                y, sr = librosa.load(file_path, sr=22050, duration=30.0)
-            
-            # Skip very short samples
-            if len(y) < sr * 0.5:
-                return None, None
-            
-            # Separate harmonic (for Key) and percussive (for BPM)
-            y_harmonic, y_percussive = librosa.effects.hpss(y)
-            
-            # === BPM Detection ===
-            bpm = None
-            try:
-                # onset_strength is generally more reliable for "feeling" the beat
-                onset_env = librosa.onset.onset_strength(y=y_percussive, sr=sr)
-                
-                # estimate tempo
-                tempo = librosa.beat.tempo(onset_envelope=onset_env, sr=sr)
-                
-                # Handle different librosa return types (scalar vs array)
-                if isinstance(tempo, np.ndarray):
-                    tempo = tempo[0]
-                
-                base_bpm = float(tempo)
-
-                # Heuristic: Prioritize 80-160 BPM range (standard dance/pop range)
-                # If detected BPM is < 80, try doubling it. If > 160, try halving it.
-                candidates = [base_bpm]
-                if base_bpm < 80:
-                    candidates.append(base_bpm * 2)
-                if base_bpm > 160:
-                    candidates.append(base_bpm / 2)
-                
-                # Filter candidates within strictly reasonable bounds
-                valid_candidates = [b for b in candidates if 40 <= b <= 200]
-                
-                # Pick the one closest to the 100-130 "sweet spot" if multiple exist
-                if valid_candidates:
-                    # Sort by distance to 120 BPM
-                    final_bpm = min(valid_candidates, key=lambda x: abs(x - 120))
-                    bpm = round(final_bpm, 1)
-            except Exception as e:
-                print(f"Librosa BPM Error: {e}")
-                pass
-            
-            # === Key Detection ===
-            key = None
-            try:
-                # Chroma CQT is robust for musical pitch
-                chroma = librosa.feature.chroma_cqt(y=y_harmonic, sr=sr, hop_length=512)
-                chroma_mean = np.mean(chroma, axis=1)
-                
-                if np.std(chroma_mean) >= 1e-6:
-                    pitch_classes = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
-                    
-                    # Krumhansl-Schmuckler profiles
-                    major_profile = np.array([6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88])
-                    minor_profile = np.array([6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17])
-                    
-                    # Normalize profiles
-                    major_profile /= np.linalg.norm(major_profile)
-                    minor_profile /= np.linalg.norm(minor_profile)
-                    
-                    # Normalize chroma
-                    chroma_mean /= (np.linalg.norm(chroma_mean) + 1e-8)
-                    
-                    correlations = []
-                    for i in range(12):
-                        # Roll the chroma vector to match the template
-                        rolled_chroma = np.roll(chroma_mean, -i)
-                        
-                        corr_maj = np.dot(rolled_chroma, major_profile)
-                        corr_min = np.dot(rolled_chroma, minor_profile)
-                        
-                        correlations.append((pitch_classes[i], 'Maj', corr_maj))
-                        correlations.append((pitch_classes[i], 'Min', corr_min))
-                    
-                    # Get best match
-                    best_match = max(correlations, key=lambda x: x[2])
-                    
-                    # Confidence threshold (arbitrary, but 0.5 is usually safe)
-                    if best_match[2] > 0.5:
-                        key = f"{best_match[0]} {best_match[1]}"
-            except Exception as e:
-                print(f"Librosa Key Error: {e}")
-                pass
-            
-            return bpm, key
-            
-        except Exception:
-            return None, None
+        return analyze_bpm_and_key(file_path, fast=fast)
     
+    def _prepare_files(self, file_paths):
+        """Yield (path, prepare_file(path)) in order, decoding ahead on a thread pool.
+
+        At most INDEXING_PREFETCH files are in flight so decoded audio can't pile
+        up in memory when the embedding model is the slower side.
+
+        The pool already runs one thread per core, so numpy's BLAS is held to a
+        single thread meanwhile (process-wide; torch's own thread pool, which
+        runs the CLAP model on CPU, is not a BLAS pool and keeps its setting).
+        """
+        with threadpool_limits(limits=1, user_api='blas'), \
+                ThreadPoolExecutor(max_workers=INDEXING_WORKERS) as executor:
+            pending = deque()
+            paths = iter(file_paths)
+            for path in paths:
+                pending.append((path, executor.submit(prepare_file, path)))
+                if len(pending) >= INDEXING_PREFETCH:
+                    break
+            while pending:
+                path, future = pending.popleft()
+                next_path = next(paths, None)
+                if next_path is not None:
+                    pending.append((next_path, executor.submit(prepare_file, next_path)))
+                yield path, future.result()
+
     def run_indexing(self, folder_path, progress_callback=None): 
         print(f"Scanning {folder_path}...")
-        existing_ids = set(self.collection.get()["ids"])
+        # Only the ids are needed here, not every document and metadata
+        existing_ids = frozenset(self.collection.get(include=[])["ids"])
         files_to_process = []
+        durations = {}  # Stored with each sample so filtering never reopens the file
 
-        for root, dirs, files in os.walk(folder_path):
-            for file in files:
-                if file.lower().endswith(('.wav', '.mp3', '.aif', '.aiff', '.flac', '.ogg', '.opus', '.m4a', '.aac')):
-                    full_path = os.path.join(root, file)
-                    full_path = os.path.normpath(full_path)
-                    if full_path in existing_ids: #Filter existing ids in DB
-                        continue
-                    duration = self.get_duration(full_path)
-                    if duration is not None and duration <= MAX_DURATION: #Filter by max duration
-                        files_to_process.append(full_path)
+        for full_path in iter_audio_files(folder_path):
+            full_path = os.path.normpath(full_path)
+            if full_path in existing_ids: #Filter existing ids in DB
+                continue
+            duration = self.get_duration(full_path)
+            if duration is not None and MIN_DURATION <= duration <= MAX_DURATION: #Filter by duration
+                files_to_process.append(full_path)
+                durations[full_path] = duration
 
         print(f"Found {len(files_to_process)} files. Indexing...")
         count = 0
-        for i, filepath in enumerate(tqdm(files_to_process)):
-            # 1. Get Embedding (requires 48kHz usually)
-            vector = self.get_audio_embedding(filepath)
-            
-            if vector:
-                # 2. Get BPM and Key in ONE pass (uses 22kHz)
-                # This replaces the separate self.get_bpm() and self.get_key() calls
-                bpm, key = self.get_bpm_and_key(filepath)
-                
-                metadata = {
-                    "filename": os.path.basename(filepath),
-                    "bpm": bpm if bpm is not None else 0.0,
-                    "key": key if key is not None else "",
-                    "analysis_engine": self.audio_engine.lower()  # Track which engine was used
-                }
-                
-                self.collection.add(
-                    embeddings=[vector],
-                    documents=[filepath],
-                    metadatas=[metadata],
-                    ids=[filepath]
-                )
-                count += 1
-            if progress_callback:
-                percent = int(((i+1)/len(files_to_process))*100)
-                progress_callback(percent)
+        total = len(files_to_process)
+        batch = []  # (filepath, audio, bpm, key, duration) waiting for the model
+        ids, embeddings, metadatas = [], [], []  # Embedded, waiting for the DB write
+        try:
+            for i, (filepath, (audio, bpm, key)) in enumerate(tqdm(
+                    self._prepare_files(files_to_process), total=total)):
+                # Decode and BPM/Key already ran on a worker thread; the model
+                # forward pass and DB writes stay here, one batch at a time
+                if audio is not None:
+                    batch.append((filepath, audio, bpm, key, durations[filepath]))
+                if len(batch) >= EMBEDDING_BATCH_SIZE or i + 1 == total:
+                    vectors = self.embed_audio_batch([item[1] for item in batch],
+                                                     [item[0] for item in batch]) if batch else []
+                    for (path, _, path_bpm, path_key, duration), vector in zip(batch, vectors):
+                        if vector:
+                            ids.append(path)
+                            embeddings.append(vector)
+                            metadatas.append({
+                                "filename": os.path.basename(path),
+                                "bpm": path_bpm if path_bpm is not None else 0.0,
+                                "key": path_key if path_key is not None else "",
+                                "duration": float(duration),
+                                "analysis_engine": self.audio_engine.lower()  # Track which engine was used
+                            })
+                    batch = []
+                    if len(ids) >= DB_WRITE_BATCH_SIZE:
+                        self.collection.add(embeddings=embeddings, documents=ids,
+                                            metadatas=metadatas, ids=ids)
+                        count += len(ids)
+                        ids, embeddings, metadatas = [], [], []
+                    if progress_callback:
+                        percent = int(((i+1)/total)*100)
+                        progress_callback(percent)
+        finally:
+            # Write the tail, and keep what was already embedded if indexing
+            # stops early
+            if ids:
+                self.collection.add(embeddings=embeddings, documents=ids,
+                                    metadatas=metadatas, ids=ids)
+                count += len(ids)
 
         return count
+
+
+_indexer_cache = {}
+_indexer_cache_lock = threading.Lock()
+
+def get_indexer(db_path=DB_PATH):
+    """Return the IndexerBackend for db_path, creating it on first use.
+
+    Keeps the loaded model and the DB connection warm across indexing runs.
+    The lock stops two workers from loading the same backend concurrently.
+    """
+    key = os.path.normpath(db_path)
+    with _indexer_cache_lock:
+        indexer = _indexer_cache.get(key)
+        if indexer is None:
+            indexer = _indexer_cache[key] = IndexerBackend(db_path=db_path)
+        return indexer
@@ -1,20 +1,19 @@
 import os
+from collections import OrderedDict
 from typing import List, Dict, Optional
 
 import torch
 import chromadb
-from transformers import ClapModel, ClapProcessor
 
-# Default model name from HuggingFace
-# MODEL_NAME = "laion/clap-htsat-unfused"
-MODEL_NAME = "laion/larger_clap_music_and_speech"
-
-# Use local model cache to avoid downloading from HuggingFace
-LOCAL_MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'cloud_api', 'model_cache', MODEL_NAME.replace('/', '_'))
+from clap_loader import load_clap
 
 # Default database path
 DEFAULT_DB_PATH = "./sample_db"
 
+# Query vectors kept per searcher, so re-running a query (e.g. after a filter
+# change) skips the text encoder
+TEXT_CACHE_SIZE = 128
+
 
 class SampleSearcher:
     """Lightweight searcher wrapper around CLAP + ChromaDB.
@@ -35,31 +34,11 @@ class SampleSearcher:
     ) -> None:
         self.db_path = db_path or DEFAULT_DB_PATH
         self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        # Run the text encoder under FP16 autocast on GPU
+        self.use_fp16 = self.device.startswith("cuda")
 
-        # Use local model if available, otherwise fallback to HuggingFace
-        use_local = False
-        if model_name is None:
-            # Check if local model exists AND has required files
-            if os.path.exists(LOCAL_MODEL_PATH) and os.path.exists(os.path.join(LOCAL_MODEL_PATH, 'config.json')):
-                model_name = LOCAL_MODEL_PATH
-                use_local = True
-                print(f"Using local model cache: {model_name}")
-            else:
-                model_name = MODEL_NAME
-                print(f"Using HuggingFace model: {model_name}")
-
-        # Load model & processor
-        print(f"Loading CLAP model on: {self.device}")
-        if use_local:
-            self.model = ClapModel.from_pretrained(model_name, use_safetensors=True, local_files_only=True).to(self.device)
-            self.processor = ClapProcessor.from_pretrained(model_name, local_files_only=True)
-        else:
-            # Download to custom cache directory
-            cache_base = os.path.join(os.path.dirname(__file__), '..', 'cloud_api', 'model_cache')
-            os.makedirs(cache_base, exist_ok=True)
-            print(f"Downloading model to: {LOCAL_MODEL_PATH}")
-            self.model = ClapModel.from_pretrained(model_name, use_safetensors=True, cache_dir=LOCAL_MODEL_PATH).to(self.device)
-            self.processor = ClapProcessor.from_pretrained(model_name, cache_dir=LOCAL_MODEL_PATH)
+        # Load model & processor (shared with the indexer if it already loaded them)
+        self.model, self.processor = load_clap(model_name, self.device)
 
         # Connect to Chroma DB
         if not os.path.exists(self.db_path):
@@ -68,38 +47,60 @@ class SampleSearcher:
         self.chroma_client = chromadb.PersistentClient(path=self.db_path)
         self.collection = self.chroma_client.get_collection(name="samples_library")
 
-    def search(self, query_text: str, top_k: int = 10) -> List[Dict]:
-        """Search for `query_text` and return structured results.
+        # query text -> query vector, least recently used first
+        self._text_cache = OrderedDict()
+
+    def encode_text(self, query_text: str) -> List[float]:
+        """Unit-length CLAP text embedding of `query_text` (LRU cached)"""
+        query_vector = self._text_cache.get(query_text)
+        if query_vector is not None:
+            self._text_cache.move_to_end(query_text)
+            return query_vector
 
-        Returns a list of dicts: { 'filename': ..., 'route': ..., 'score': ... }
-        """
         text_inputs = self.processor(text=[query_text], return_tensors="pt")
         text_inputs = {k: v.to(self.device) for k, v in text_inputs.items()}
 
-        with torch.no_grad():
+        with torch.inference_mode(), torch.autocast("cuda", dtype=torch.float16, enabled=self.use_fp16):
             text_output = self.model.get_text_features(**text_inputs)
             # Extract the tensor from the output object
             text_embed = text_output.pooler_output if hasattr(text_output, 'pooler_output') else text_output
 
-        query_vector = text_embed.cpu().numpy().tolist()[0]
-        results = self.collection.query(query_embeddings=[query_vector], n_results=top_k)
+        # Unit length like the stored audio embeddings, so distance = 2 - 2*cosine
+        query_vector = torch.nn.functional.normalize(text_embed.float(), dim=-1)
+        query_vector = query_vector.cpu().numpy().tolist()[0]
+
+        self._text_cache[query_text] = query_vector
+        if len(self._text_cache) > TEXT_CACHE_SIZE:
+            self._text_cache.popitem(last=False)
+        return query_vector
+
+    def search(self, query_text: str, top_k: int = 10, where: Optional[Dict] = None) -> List[Dict]:
+        """Search for `query_text` and return structured results.
+
+        `where` is an optional ChromaDB metadata filter applied by the query
+        itself, so `top_k` counts only matching samples.
+
+        Returns a list of dicts: { 'filename': ..., 'route': ..., 'score': ... }
+        """
+        if not query_text.strip():
+            return []
+        query_vector = self.encode_text(query_text)
+        results = self.collection.query(query_embeddings=[query_vector], n_results=top_k, where=where)
 
         routes = results.get('ids', [[]])[0]
         metadatas = results.get('metadatas', [[]])[0]
         distances = results.get('distances', [[]])[0]
 
-        out: List[Dict] = []
-        for i in range(len(routes)):
-            filename = metadatas[i].get('filename') if i < len(metadatas) else None
-            metadata = metadatas[i] if i < len(metadatas) else {}
-            complete_route = routes[i]
-            score = distances[i]
-            out.append({
-                'filename': filename,
-                'route': complete_route,
-                'score': score,
+        # Chroma returns the ids, metadatas and distances of a query as parallel lists
+        out: List[Dict] = [
+            {
+                'filename': metadata.get('filename'),
+                'route': route,
+                'score': distance,
                 'metadata': metadata
-            })
+            }
+            for route, metadata, distance in zip(routes, metadatas, distances)
+        ]
 
         return out
 